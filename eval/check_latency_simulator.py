@@ -0,0 +1,183 @@
+"""Smoke checks of the latency simulator.
+
+Runs every replica model on a few short timelines and checks that the results
+are sane, so a broken engine fails here rather than in the middle of a sweep.
+Also compares the event-driven engine with the polling engine it replaced.
+Run with `python3 -m eval.check_latency_simulator`.
+"""
+
+import collections
+import itertools
+import math
+import tempfile
+
+import numpy as np
+import simpy
+
+from policies import latency_simulator
+from policies.latency_simulator import LatencyParams, ReplicaModelType
+from policies.load_balancer import LoadBalancerType
+from policies.workload import Workload, WorkloadType
+from utils import config, request_log
+
+# The polling engine dispatched up to 10 ms late, which shifts p50, p90 and
+# p99 a little; beyond this relative difference the engines disagree. P99.9
+# rests on a handful of requests in these short runs and is not compared.
+_POLLING_TOLERANCE = 0.02
+
+_TIMELINES = {
+    "steady": [3] * 200,
+    "flapping": [0, 1, 4, 2, 5, 1, 0, 3] * 25,
+}
+
+
+def _params(workload, **overrides) -> LatencyParams:
+    params = LatencyParams(
+        latency_engine=config.latency_engine,
+        load_balancer=config.load_balancer,
+        redistribute_requests=config.redistribute_requests,
+        replica_model=config.replica_model,
+        max_batch_size=config.max_batch_size,
+        batch_step_time=config.batch_step_time,
+        batch_step_slowdown=config.batch_step_slowdown,
+        service_time_model=config.service_time_model,
+        prefill_time_per_token=config.prefill_time_per_token,
+        decode_time_per_token=config.decode_time_per_token,
+        output_len_distribution=config.output_len_distribution,
+        output_len_mean=config.output_len_mean,
+        output_len_max=config.output_len_max,
+        time_tick_in_seconds=config.time_tick_in_seconds,
+        service_rate=workload.service_rate,
+        timeout=workload.timeout,
+    )
+    return params._replace(**overrides)
+
+
+def _check_result(result, timeout, label) -> None:
+    *percentiles, sketch = result
+    assert all(math.isfinite(p) for p in percentiles), (label, percentiles)
+    assert percentiles == sorted(percentiles), (label, percentiles)
+    assert 0 < percentiles[0] and percentiles[-1] <= timeout * 1.01, (
+        label,
+        percentiles,
+    )
+    assert sketch.count > 0, label
+
+
+def check_replica_models() -> None:
+    """Every replica model, balancer and timeline runs and gives sane results."""
+    workload_cls = Workload.from_name(WorkloadType.Poisson)
+    workload = workload_cls(use_simulator=True)
+    for replica_model, lb, redistribute, (name, node_counts) in itertools.product(
+        ReplicaModelType,
+        [LoadBalancerType.RoundRobin, LoadBalancerType.LeastLoaded],
+        [False, True],
+        _TIMELINES.items(),
+    ):
+        label = (replica_model.value, lb.value, redistribute, name)
+        params = _params(
+            workload,
+            replica_model=replica_model.value,
+            load_balancer=lb.value,
+            redistribute_requests=redistribute,
+        )
+        with tempfile.TemporaryDirectory() as log_dir:
+            result = latency_simulator._run_simulation(
+                node_counts, workload_cls, params, request_log_dir=log_dir
+            )
+            log = request_log.load_request_log(log_dir)
+            assert len(log["latency"]) == result[-1].count, label
+        _check_result(result, workload.timeout, label)
+        print("OK", *label, [round(p, 2) for p in result[:4]])
+
+
+def _simulate_polling(node_counts, workload_cls, time_tick_in_seconds):
+    """Latencies from the polling engine that event-driven dispatch replaced.
+
+    A server process wakes every 10 ms and starts the head request of every
+    idle node; everything else is as in `latency_simulator` with round-robin
+    clients, single-server nodes and exponential service.
+    """
+    env = simpy.Environment()
+    workloads = [
+        workload_cls(seed=i, use_simulator=True)
+        for i in range(latency_simulator.NUM_CLIENTS)
+    ]
+    # Nodes draw service times from the first client's random engine.
+    service_workload = workloads[0]
+    timeout = service_workload.timeout
+    nodes = []
+    serving_times = []
+
+    def serve(node, arrival_time):
+        node["busy"] = True
+        if env.now - arrival_time > timeout:
+            serving_times.append(timeout)
+        else:
+            service_rate = service_workload.service_rate
+            yield env.timeout(service_workload.np_random.exponential(1 / service_rate))
+            serving_times.append(env.now - arrival_time)
+        node["busy"] = False
+
+    def client(workload):
+        i = 0
+        node_idx = 0
+        while True:
+            yield env.timeout(workload.get_next_interarrival_time(i))
+            i += 1
+            if not nodes:
+                serving_times.append(timeout)
+                continue
+            nodes[node_idx % len(nodes)]["queue"].append(env.now)
+            node_idx += 1
+
+    def server():
+        while True:
+            for node in nodes:
+                if not node["busy"] and node["queue"]:
+                    env.process(serve(node, node["queue"].popleft()))
+            yield env.timeout(0.01)
+
+    def adjust_nodes():
+        for count in node_counts:
+            while len(nodes) < count:
+                nodes.append({"busy": False, "queue": collections.deque()})
+            while len(nodes) > count:
+                serving_times.extend([timeout] * len(nodes.pop()["queue"]))
+            yield env.timeout(time_tick_in_seconds)
+
+    for workload in workloads:
+        env.process(client(workload))
+    env.process(server())
+    env.process(adjust_nodes())
+    env.run(until=len(node_counts) * time_tick_in_seconds + 1)
+    return serving_times
+
+
+def check_against_polling() -> None:
+    """Percentiles of both engines agree on fixed seeds and timelines."""
+    workload_cls = Workload.from_name(WorkloadType.Poisson)
+    workload = workload_cls(use_simulator=True)
+    params = _params(workload, latency_engine="SimPy")
+    for name, node_counts in {
+        "steady 2": [2] * 500,
+        "steady 4": [4] * 500,
+    }.items():
+        event_driven = latency_simulator._run_simulation(
+            node_counts, workload_cls, params
+        )[:3]
+        polling = np.percentile(
+            _simulate_polling(node_counts, workload_cls, params.time_tick_in_seconds),
+            [50, 90, 99],
+        )
+        print("COMPARE", name, np.round(polling, 2), np.round(event_driven, 2))
+        assert np.allclose(event_driven, polling, rtol=_POLLING_TOLERANCE), (
+            name,
+            polling,
+            event_driven,
+        )
+
+
+if __name__ == "__main__":
+    check_replica_models()
+    check_against_polling()
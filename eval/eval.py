@@ -5,6 +5,9 @@ import tqdm
 from utils import config, job_runner
 from policies.fallback_policy import FallbackType
 from policies.autoscaler import AutoscalerType
+from policies.latency_simulator import LatencyEngineType, ReplicaModelType
+from policies.load_balancer import LoadBalancerType
+from policies.service_time import ServiceTimeModelType
 from policies.spot_policy import SpotPolicyType
 from policies.workload import WorkloadType
 import copy
@@ -76,6 +79,33 @@ if __name__ == "__main__":
     parser.add_argument("--seed", type=int, default=0)
     parser.add_argument("--overprovision-number", type=int, default=0)
     parser.add_argument("--cost-cap", type=int, default=-1)
+    parser.add_argument(
+        "--latency-engine",
+        type=LatencyEngineType,
+        default=LatencyEngineType.SimPy,
+        choices=list(LatencyEngineType),
+    )
+    parser.add_argument(
+        "--load-balancer",
+        type=LoadBalancerType,
+        default=LoadBalancerType.RoundRobin,
+        choices=list(LoadBalancerType),
+    )
+    parser.add_argument("--redistribute-requests", action="store_true")
+    parser.add_argument(
+        "--replica-model",
+        type=ReplicaModelType,
+        default=ReplicaModelType.SingleServer,
+        choices=list(ReplicaModelType),
+    )
+    parser.add_argument("--max-batch-size", type=int, default=config.max_batch_size)
+    parser.add_argument(
+        "--service-time-model",
+        type=ServiceTimeModelType,
+        default=ServiceTimeModelType.Exponential,
+        choices=list(ServiceTimeModelType),
+    )
+    parser.add_argument("--request-log-dir", type=str, default=None)
     args = parser.parse_args()
 
     run_experiments = ["Optimal", "Main", "Sensitivity"]
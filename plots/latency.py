@@ -32,20 +32,17 @@ for workload in ['Poisson', 'Arena', 'MAF']:
             if policy == 'On-demand':
                 continue
             normalized_cost = row['cost'] / row['total_time_period'] / row['target_num_instances'] / cost_demand
-            latency_list = row['latency_list']
+            latency_sketch = row['latency_sketch']
             
             # if policy == 'SpotHedge' or policy == 'On-demand':
             #     print(policy, workload, workload, row["p99"])
-            data[trace_addr].append((policy, latency_list, normalized_cost))
+            data[trace_addr].append((policy, latency_sketch, normalized_cost))
 
     fig = plt.figure(figsize=(fig_width - 0.3 , fig_height - 1), dpi=300)
     axes = fig.subplots(1, len(traces), squeeze=True)
 
     bps = []
     
-    def flatten_2D_list(list_2d):
-        return [item for sublist in list_2d for item in sublist]
-    
     for i, trace in enumerate(data.keys()):
         ax = axes[i]
         names = sorted(list(set([t[0] for t in data[trace]])), key=lambda x: order.index(x))
@@ -53,15 +50,15 @@ for workload in ['Poisson', 'Arena', 'MAF']:
             continue
         costs_mean = [100 * np.mean([t[2] for t in data[trace] if t[0] == name]) for name in names]
         costs_std = [100 * np.std([t[2] for t in data[trace] if t[0] == name]) for name in names]
-        value_list_list = [flatten_2D_list([t[1] for t in data[trace] if t[0] == name]) for name in names]
+        box_stats = [sketch_box_stats([t[1] for t in data[trace] if t[0] == name], (10, 90), name) for name in names]
         positions = list(range(1, len(names) + 1))
         palette = [get_color(name) for name in names]
         
-        average_list = [sum(value_list) / len(value_list) for value_list in value_list_list]
+        average_list = [stats['mean'] for stats in box_stats]
         print([v / average_list[3] for v in average_list])
         print(names)
 
-        bp = ax.boxplot(value_list_list, positions=positions, labels=names, whis=(10, 90), showfliers=False, showmeans=True, meanprops=meanprops, widths=0.7, patch_artist=True, boxprops=dict(facecolor="white"), medianprops=medianprops)
+        bp = ax.bxp(box_stats, positions=positions, showfliers=False, showmeans=True, meanprops=meanprops, widths=0.7, patch_artist=True, boxprops=dict(facecolor="white"), medianprops=medianprops)
         bps.append(bp)
         ax.set_xticklabels([""] * len(ax.get_xticklabels()))
         if i != 0:
@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 import matplotlib.pyplot as plt
 import numpy as np
@@ -8,6 +9,9 @@ from matplotlib.ticker import FuncFormatter
 from matplotlib.patches import Patch
 import warnings
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.quantile_sketch import LatencySketch
+
 warnings.simplefilter(action='ignore', category=FutureWarning)
 warnings.simplefilter(action='ignore', category=UserWarning)
 
@@ -137,6 +141,30 @@ def PlotCdf(data, label=None, bins=2000, **kwargs):
     plt.plot(bin_edges[1:], cdf / cdf[-1], label=label, lw=2, **kwargs)
 
 
+def load_latency_sketch(content_json):
+    # Older results store every 10th latency sample instead of a sketch.
+    if content_json.get("latency_sketch") is not None:
+        return LatencySketch.from_dict(content_json["latency_sketch"])
+    if content_json.get("latency_list") is not None:
+        return LatencySketch.from_values(content_json["latency_list"])
+    return None
+
+
+def sketch_box_stats(sketches, whis, label=None):
+    # Box plot statistics for `ax.bxp`, merged over the given repeats.
+    sketch = LatencySketch.merged(sketches)
+    return {
+        "label": label,
+        "med": sketch.percentile(50),
+        "q1": sketch.percentile(25),
+        "q3": sketch.percentile(75),
+        "whislo": sketch.percentile(whis[0]),
+        "whishi": sketch.percentile(whis[1]),
+        "mean": sketch.mean,
+        "fliers": [],
+    }
+
+
 def get_df_from_files():
     folder_path = "../results/"  # Replace with the path to your folder
     target_columns = [
@@ -158,7 +186,7 @@ def get_df_from_files():
         "p90",
         "p99",
         "p999",
-        "latency_list",
+        "latency_sketch",
         "repeat_idx",
     ]
 
@@ -179,6 +207,7 @@ def get_df_from_files():
                         column: content_json.get(column, None)
                         for column in target_columns
                     }
+                    row_data["latency_sketch"] = load_latency_sketch(content_json)
                     df = pd.concat([df, pd.DataFrame([row_data])], ignore_index=True)
                     # df = df.append(row_data, ignore_index=True)
     return df
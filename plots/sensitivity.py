@@ -20,7 +20,7 @@ for trace_addr in traces:
     df_copy = df[plot_condition]
     names = set()
     for index, row in df_copy.iterrows():
-        latency_list = row['latency_list']
+        latency_sketch = row['latency_sketch']
         
         cold_start_delay = row['cold_start_delay']
         name = f'$d$={cold_start_delay/2}mins'
@@ -28,7 +28,7 @@ for trace_addr in traces:
             continue
         print(name, trace_addr, row['p99'])
         names.add(name)
-        data[trace_addr].append((name, latency_list))
+        data[trace_addr].append((name, latency_sketch))
                
 fig = plt.figure(figsize=(fig_width - 1.5, fig_height - 1), dpi=300)
 axes = fig.subplots(1, len(traces), sharex=True, sharey=True)
@@ -39,10 +39,10 @@ for i, trace in enumerate(data.keys()):
     if not names:
         continue
     
-    value_list_list = [pair[1] for pair in data[trace]]
+    box_stats = [sketch_box_stats([pair[1]], (10, 99), pair[0]) for pair in data[trace]]
     positions = list(range(1, len(names) + 1))
 
-    bp = ax.boxplot(value_list_list, positions=positions, labels=names, whis=(10, 99), showfliers=False, showmeans=True, meanprops=meanprops, widths=0.6, patch_artist=True, boxprops=dict(facecolor="white"), medianprops=medianprops)
+    bp = ax.bxp(box_stats, positions=positions, showfliers=False, showmeans=True, meanprops=meanprops, widths=0.6, patch_artist=True, boxprops=dict(facecolor="white"), medianprops=medianprops)
 
     boxes = bp['boxes']
     idx = 0
@@ -107,7 +107,7 @@ for trace_addr in traces:
             continue
         names.add(name)
         print(name, trace_addr, row['availability'])
-        data[trace_addr].append((name, row['latency_list']))
+        data[trace_addr].append((name, row['latency_sketch']))
                     
     fig = plt.figure(figsize=(fig_width - 1.5, fig_height - 1), dpi=300)
     ax = fig.subplots(1, 1, sharex=True, sharey=True)
@@ -117,14 +117,12 @@ for trace_addr in traces:
         if not names:
             continue
 
-        value_list_list = [pair[1] for pair in data[trace]]
+        box_stats = [sketch_box_stats([pair[1]], (10, 90), pair[0]) for pair in data[trace]]
         positions = list(range(1, len(names) + 1))
     
-        availability_mean = [100 * np.mean([t[1] for t in data[trace] if t[0] == name]) for name in names]
-        availability_std = [100 * np.std([t[1] for t in data[trace] if t[0] == name]) for name in names]
         print(positions)
         print(names)
-        bp = ax.boxplot(value_list_list, positions=positions, labels=names, whis=(10, 90), showfliers=False, showmeans=True, meanprops=meanprops, widths=0.6, patch_artist=True, boxprops=dict(facecolor="white"), medianprops=medianprops)
+        bp = ax.bxp(box_stats, positions=positions, showfliers=False, showmeans=True, meanprops=meanprops, widths=0.6, patch_artist=True, boxprops=dict(facecolor="white"), medianprops=medianprops)
         boxes = bp['boxes']
         idx = 0
         for box, _ in zip(boxes, boxes):
@@ -15,7 +15,11 @@ from policies.scheduler import (
 
 from policies.workloads import arena_workload, maf_workload, poisson_workload
 
-from policies.autoscalers import base_autoscaler, qps_autoscaler
+from policies.autoscalers import (
+    base_autoscaler,
+    predictive_autoscaler,
+    qps_autoscaler,
+)
 
 __all__ = [
     "naive_spread",
@@ -31,5 +35,6 @@ __all__ = [
     "maf_workload",
     "poisson_workload",
     "base_autoscaler",
+    "predictive_autoscaler",
     "qps_autoscaler",
 ]
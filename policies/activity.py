@@ -0,0 +1,125 @@
+import collections
+from typing import Deque, List, Sequence, Tuple
+
+import numpy as np
+
+
+def sliding_window_min(plan, window: int) -> np.ndarray:
+    """Minimum of every `window` consecutive rows of a [T] or [T, R] plan.
+
+    Uses the van Herk/Gil-Werman block decomposition, so the cost is O(T * R)
+    regardless of the window size. Row `i` of the result covers plan rows
+    `[i, i + window)`.
+    """
+    plan = np.asarray(plan)
+    num_windows = plan.shape[0] - window + 1
+    if num_windows <= 0:
+        return np.zeros((0,) + plan.shape[1:], dtype=plan.dtype)
+
+    pad = (-plan.shape[0]) % window
+    if pad:
+        fill = (
+            np.iinfo(plan.dtype).max
+            if np.issubdtype(plan.dtype, np.integer)
+            else np.inf
+        )
+        padding = np.full((pad,) + plan.shape[1:], fill, dtype=plan.dtype)
+        plan = np.concatenate([plan, padding])
+
+    blocks = plan.reshape((-1, window) + plan.shape[1:])
+    prefix = np.minimum.accumulate(blocks, axis=1).reshape(plan.shape)
+    suffix = np.minimum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1]
+    suffix = suffix.reshape(plan.shape)
+    return np.minimum(
+        suffix[:num_windows], prefix[window - 1 : window - 1 + num_windows]
+    )
+
+
+def active_counts(plan, cold_start_delay: int) -> np.ndarray:
+    """Number of active replicas at every tick of a [T] or [T, R] plan.
+
+    A replica only serves traffic once it has been provisioned for
+    `cold_start_delay` ticks, so the active count at tick `t` is the minimum of
+    the plan over `[t - cold_start_delay, t]`, and zero before the first full
+    window.
+    """
+    plan = np.asarray(plan)
+    active = np.zeros_like(plan)
+    active[cold_start_delay:] = sliding_window_min(plan, cold_start_delay + 1)
+    return active
+
+
+class ActivityTracker:
+    """Active spot and on-demand counts for a plan that is filled tick by tick.
+
+    Each region keeps a monotonic deque of (tick, count), so recording a tick
+    costs O(R) amortized and querying an already recorded tick costs O(1).
+    Ticks that have not been recorded yet count as inactive, matching the
+    zero-initialised plan rows they would otherwise be read from.
+
+    The tracker also accumulates how many ticks had at least `num_min` active
+    replicas, so availability over any prefix of the run is an O(1) query.
+    """
+
+    def __init__(
+        self, num_ticks: int, num_regions: int, cold_start_delay: int, num_min: int
+    ):
+        self.num_regions = num_regions
+        self.cold_start_delay = cold_start_delay
+        self.num_min = num_min
+        self._active_spot = np.zeros(num_ticks, dtype=np.int64)
+        self._active_demand = np.zeros(num_ticks, dtype=np.int64)
+        # _num_available[t] is the number of available ticks in [0, t).
+        self._num_available = np.zeros(num_ticks + 1, dtype=np.int64)
+        self.reset()
+
+    def reset(self) -> None:
+        self._num_recorded = 0
+        self._spot_windows: List[Deque[Tuple[int, int]]] = [
+            collections.deque() for _ in range(self.num_regions)
+        ]
+        self._demand_window: Deque[Tuple[int, int]] = collections.deque()
+        self._active_spot.fill(0)
+        self._active_demand.fill(0)
+        self._num_available.fill(0)
+
+    def _push(self, window: Deque[Tuple[int, int]], t: int, count: int) -> int:
+        while window and window[-1][1] >= count:
+            window.pop()
+        window.append((t, count))
+        while window[0][0] < t - self.cold_start_delay:
+            window.popleft()
+        return window[0][1] if t >= self.cold_start_delay else 0
+
+    def record(self, t: int, spot_row: Sequence[int], num_demand: int) -> None:
+        """Records the final plan of tick `t`; ticks must be recorded in order."""
+        assert t == self._num_recorded, (t, self._num_recorded)
+        self._active_spot[t] = sum(
+            self._push(window, t, int(count))
+            for window, count in zip(self._spot_windows, spot_row)
+        )
+        self._active_demand[t] = self._push(self._demand_window, t, int(num_demand))
+        is_available = self._active_spot[t] + self._active_demand[t] >= self.num_min
+        self._num_available[t + 1] = self._num_available[t] + is_available
+        self._num_recorded += 1
+
+    def num_active_spot(self, t: int) -> int:
+        if 0 <= t < self._num_recorded:
+            return int(self._active_spot[t])
+        return 0
+
+    def num_active_demand(self, t: int) -> int:
+        if 0 <= t < self._num_recorded:
+            return int(self._active_demand[t])
+        return 0
+
+    def num_active(self, t: int) -> int:
+        return self.num_active_spot(t) + self.num_active_demand(t)
+
+    def num_available_ticks(self, end: int) -> int:
+        """Number of ticks in [0, end) with at least `num_min` active replicas."""
+        return int(self._num_available[max(0, min(end, self._num_recorded))])
+
+    def availability(self, current_time: int) -> float:
+        """Fraction of ticks in [0, current_time] that met `num_min`."""
+        return self.num_available_ticks(current_time + 1) / (current_time + 1)
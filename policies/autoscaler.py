@@ -1,22 +1,38 @@
-from typing import Dict, Type
+from typing import Dict, Optional, Tuple, Type
+
+import numpy as np
 
 from policies import workload as workload_lib
-from utils import config
+from utils import context
 import enum
 
 
+# Target timelines computed by this process. They only depend on the
+# workload, the autoscaler and the experiment length, so every spot policy of
+# a sweep shares them.
+_TIMELINE_STORE: Dict[Tuple, np.ndarray] = {}
+
+
 class AutoscalerType(enum.Enum):
     BaseAutoscaler = "BaseAutoscaler"
     QpsAutoscaler = "QpsAutoscaler"
+    PredictiveAutoscaler = "PredictiveAutoscaler"
 
 
 class Autoscaler:
     NAME = "Autoscaler"
     REGISTRY: Dict[str, Type["Autoscaler"]] = dict()
 
-    def __init__(self, workload: workload_lib.Workload) -> None:
+    def __init__(
+        self, workload: workload_lib.Workload, ctx: context.SimulationContext
+    ) -> None:
         self.window_size = 60  # tick = 30s. 60 ticks = 30 mins
         self.workload = workload
+        self.ctx = ctx
+        # Request rate at every tick so far, filled in bulk on demand.
+        self._request_rates = np.zeros(0)
+        # Target timelines of every repeat, once computed.
+        self._target_timelines: Optional[np.ndarray] = None
 
     def __init_subclass__(cls) -> None:
         if cls.NAME is None:
@@ -32,15 +48,86 @@ class Autoscaler:
     def get_target_num_replicas(self, t):
         raise NotImplementedError
 
+    def get_target_timeline(self, repeat: int) -> np.ndarray:
+        """Target replicas at every tick of a repeat, as `run_exp` asks for them.
+
+        Row `i` holds the targets for ticks `i` to `i + total_time_period - 1`.
+        All repeats are computed at once, in the order a policy runs them, so
+        autoscalers that keep state between repeats give the same targets.
+        """
+        if self._target_timelines is None:
+            key = self._timeline_key()
+            if key is None:
+                self._target_timelines = workload_lib.read_only(
+                    self._compute_target_timelines()
+                )
+            else:
+                if key not in _TIMELINE_STORE:
+                    _TIMELINE_STORE[key] = workload_lib.read_only(
+                        self._compute_target_timelines()
+                    )
+                self._target_timelines = _TIMELINE_STORE[key]
+        return self._target_timelines[repeat]
+
+    def _timeline_key(self):
+        """Everything the target timelines depend on, or None to not share them."""
+        if self.workload.data_key is None:
+            return None
+        return (
+            self.NAME,
+            self.workload.data_key,
+            self.window_size,
+            self.ctx.target_num_instances,
+            self.ctx.num_min,
+            self.ctx.total_time_period,
+            self.ctx.num_repeats,
+            self.ctx.time_tick_in_seconds,
+        )
+
+    def _compute_target_timelines(self) -> np.ndarray:
+        return np.array(
+            [
+                [
+                    self.get_target_num_replicas(t + i)
+                    for t in range(self.ctx.total_time_period)
+                ]
+                for i in range(self.ctx.num_repeats)
+            ],
+            dtype=np.int64,
+        )
+
+    def get_request_rates(self, ts, window_size=None):
+        """Request rate over the window before each tick, in one call.
+
+        The window spans `window_size` ticks, by default `self.window_size`.
+        """
+        if window_size is None:
+            window_size = self.window_size
+        ts = np.asarray(ts)
+        starts = np.maximum(0, ts - window_size)
+        num_requests = self.workload.get_window_num_requests_many(
+            starts * self.ctx.time_tick_in_seconds,
+            ts * self.ctx.time_tick_in_seconds,
+        )
+        window_sizes = np.maximum(ts - starts, 1)
+        rates = num_requests / window_sizes / self.ctx.time_tick_in_seconds
+        return np.where(ts == 0, 0, rates)
+
     def get_current_request_rate(self, t):
-        if t == 0:
-            return 0
-        num_requests = self.workload.get_window_num_requests(
-            max(0, t - self.window_size) * config.time_tick_in_seconds,
-            t * config.time_tick_in_seconds,
+        if t >= len(self._request_rates):
+            # Covers every tick a run with repeat offsets asks for.
+            num_ticks = max(
+                t + 1,
+                2 * len(self._request_rates),
+                self.ctx.total_time_period + self.ctx.num_repeats,
+            )
+            self._request_rates = self.get_request_rates(np.arange(num_ticks))
+        start_time = max(0, t - self.window_size) * self.ctx.time_tick_in_seconds
+        assert t == 0 or start_time <= self.workload.request_arrival_times[-1], (
+            t,
+            self.workload.request_arrival_times[-1],
         )
-        window_size = t - max(0, t - self.window_size)
-        return num_requests / window_size / config.time_tick_in_seconds
+        return float(self._request_rates[t])
 
     def get_current_request_rate_autoscaler(self, t):
         return self.get_current_request_rate(t)
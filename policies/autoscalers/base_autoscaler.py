@@ -1,14 +1,22 @@
+import numpy as np
+
 from policies import autoscaler
 from policies.autoscaler import AutoscalerType
-from utils import config
 
 
 class BaseAutoscaler(autoscaler.Autoscaler):
     NAME = AutoscalerType.BaseAutoscaler
 
-    def __init__(self, workload) -> None:
-        super().__init__(workload)
-        self._target_num_replicas = config.target_num_instances
+    def __init__(self, workload, ctx) -> None:
+        super().__init__(workload, ctx)
+        self._target_num_replicas = ctx.target_num_instances
 
     def get_target_num_replicas(self, t):
         return self._target_num_replicas
+
+    def _compute_target_timelines(self) -> np.ndarray:
+        return np.full(
+            (self.ctx.num_repeats, self.ctx.total_time_period),
+            self._target_num_replicas,
+            dtype=np.int64,
+        )
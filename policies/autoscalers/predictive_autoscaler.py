@@ -0,0 +1,93 @@
+import numpy as np
+from scipy import signal
+
+from policies import autoscaler
+from policies import workload as workload_lib
+from policies.autoscaler import AutoscalerType
+
+
+class PredictiveAutoscaler(autoscaler.Autoscaler):
+    """Provisions for the request rate forecast one cold start ahead.
+
+    Replicas launched at tick t only serve from t + cold_start_delay, so the
+    target follows the demand forecast for that tick rather than the trailing
+    rate. The forecast uses Holt's linear trend method on the per-tick
+    request rate. Scaling up happens as soon as the forecast needs more
+    replicas. Scaling down happens only once the forecast has stayed lower for
+    `downscale_interval_seconds`, as in QpsAutoscaler.
+
+    Smoothing and extrapolation are one linear filter and the downscale delay
+    is a rolling maximum, so the targets of a whole run take a few array
+    operations.
+    """
+
+    NAME = AutoscalerType.PredictiveAutoscaler
+
+    def __init__(self, workload: workload_lib.Workload, ctx) -> None:
+        self.target_qps_per_replica = workload.service_rate
+        self.num_max = ctx.target_num_instances * 2
+        self.num_min = ctx.num_min
+        # Per-tick smoothing factors of Holt's level and trend.
+        self.level_smoothing = 0.1
+        self.trend_smoothing = 0.02
+        self.downscale_interval_seconds = 1200
+        super().__init__(workload, ctx)
+        self._targets = np.zeros(0, dtype=np.int64)
+
+    def get_target_num_replicas(self, t):
+        if t >= len(self._targets):
+            num_ticks = max(
+                t + 1,
+                2 * len(self._targets),
+                self.ctx.total_time_period + self.ctx.num_repeats,
+            )
+            self._targets = self._compute_targets(num_ticks)
+        return int(self._targets[t])
+
+    def forecast_request_rates(self, num_ticks: int) -> np.ndarray:
+        """Forecast rate at `cold_start_delay` ticks after each of the first ticks."""
+        rates = self.get_request_rates(np.arange(num_ticks), window_size=1)
+        a = self.level_smoothing
+        b = self.trend_smoothing
+        h = self.ctx.cold_start_delay
+        # Holt's level + h * trend, as a filter over the rates: the recursions
+        # l_t = a x_t + (1 - a)(l_{t-1} + b_{t-1}) and
+        # b_t = b (l_t - l_{t-1}) + (1 - b) b_{t-1}, starting from zero.
+        numerator = [a * (1 + h * b), -a * (1 - b + h * b)]
+        denominator = [1, -(2 - a - a * b), 1 - a]
+        return np.maximum(signal.lfilter(numerator, denominator, rates), 0)
+
+    def _compute_targets(self, num_ticks: int) -> np.ndarray:
+        forecast = self.forecast_request_rates(num_ticks)
+        demand = np.clip(
+            np.ceil(forecast / self.target_qps_per_replica), self.num_min, self.num_max
+        ).astype(np.int64)
+        # Holding every target for the downscale interval is a rolling maximum.
+        hold = max(
+            1, int(self.downscale_interval_seconds / self.ctx.time_tick_in_seconds)
+        )
+        padded = np.concatenate(
+            [np.full(hold - 1, self.num_min, dtype=np.int64), demand]
+        )
+        return np.lib.stride_tricks.sliding_window_view(padded, hold).max(axis=1)
+
+    def _timeline_key(self):
+        key = super()._timeline_key()
+        if key is None:
+            return None
+        return key + (
+            self.target_qps_per_replica,
+            self.num_max,
+            self.level_smoothing,
+            self.trend_smoothing,
+            self.downscale_interval_seconds,
+            self.ctx.cold_start_delay,
+        )
+
+    def _compute_target_timelines(self) -> np.ndarray:
+        targets = self._compute_targets(
+            self.ctx.total_time_period + self.ctx.num_repeats - 1
+        )
+        return np.lib.stride_tricks.sliding_window_view(
+            targets, self.ctx.total_time_period
+        )[: self.ctx.num_repeats].copy()
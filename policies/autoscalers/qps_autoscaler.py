@@ -1,24 +1,25 @@
 import math
 
+import numpy as np
+
 from policies import autoscaler
 from policies import workload as workload_lib
-from utils import config
 from policies.autoscaler import AutoscalerType
 
 
 class QpsAutoscaler(autoscaler.Autoscaler):
     NAME = AutoscalerType.QpsAutoscaler
 
-    def __init__(self, workload: workload_lib.Workload) -> None:
+    def __init__(self, workload: workload_lib.Workload, ctx) -> None:
         self.target_qps_per_replica = workload.service_rate
-        self.num_max = config.target_num_instances * 2
-        self.num_min = config.num_min
+        self.num_max = ctx.target_num_instances * 2
+        self.num_min = ctx.num_min
         self.num_tar = self.num_min
         self.downscale_counter = 0
         self.upscale_counter = 0
         self.upscale_interval_seconds = 300
         self.downscale_interval_seconds = 1200
-        super().__init__(workload)
+        super().__init__(workload, ctx)
 
     def reset(self) -> None:
         self.downscale_counter = 0
@@ -27,7 +28,45 @@ class QpsAutoscaler(autoscaler.Autoscaler):
     def get_target_num_replicas(self, t):
         request_rates = self.get_current_request_rate(t)
         num_replicas = math.ceil(request_rates / self.target_qps_per_replica)
+        return self._step(t, request_rates, num_replicas)
+
+    def _timeline_key(self):
+        key = super()._timeline_key()
+        if key is None:
+            return None
+        return key + (
+            self.target_qps_per_replica,
+            self.num_max,
+            self.upscale_interval_seconds,
+            self.downscale_interval_seconds,
+        )
+
+    def _compute_target_timelines(self) -> np.ndarray:
+        # Request rates and replica demand of every tick in one pass; only the
+        # up/downscale counters are stepped tick by tick.
+        num_ticks = self.ctx.total_time_period + self.ctx.num_repeats - 1
+        ticks = np.arange(num_ticks)
+        request_rates = self.get_request_rates(ticks)
+        last_start_time = max(0, num_ticks - 1 - self.window_size)
+        assert (
+            last_start_time * self.ctx.time_tick_in_seconds
+            <= self.workload.request_arrival_times[-1]
+        ), (num_ticks - 1, self.workload.request_arrival_times[-1])
+        num_replicas = np.ceil(request_rates / self.target_qps_per_replica)
+        request_rates = request_rates.tolist()
+        num_replicas = num_replicas.astype(np.int64).tolist()
+        timelines = np.empty(
+            (self.ctx.num_repeats, self.ctx.total_time_period), dtype=np.int64
+        )
+        for i in range(self.ctx.num_repeats):
+            for t in range(self.ctx.total_time_period):
+                timelines[i, t] = self._step(
+                    t + i, request_rates[t + i], num_replicas[t + i]
+                )
+        return timelines
 
+    def _step(self, t, request_rates, num_replicas):
+        """Advances the up/downscale counters by one tick; returns the target."""
         # print('QPS AUTOSCALER', t, 'request_rates: ', request_rates,
         #   'num_replicas', num_replicas)
         if num_replicas > self.num_tar:
@@ -43,7 +82,7 @@ class QpsAutoscaler(autoscaler.Autoscaler):
         # ARENA: 5 mins
         if (
             self.upscale_counter
-            >= self.upscale_interval_seconds / config.time_tick_in_seconds
+            >= self.upscale_interval_seconds / self.ctx.time_tick_in_seconds
             and self.num_tar < self.num_max
         ):
             self.num_tar = num_replicas
@@ -67,7 +106,7 @@ class QpsAutoscaler(autoscaler.Autoscaler):
         # ARENA: 20 mins
         if (
             self.downscale_counter
-            >= self.downscale_interval_seconds / config.time_tick_in_seconds
+            >= self.downscale_interval_seconds / self.ctx.time_tick_in_seconds
             and self.num_tar > self.num_min
         ):
             self.num_tar = num_replicas
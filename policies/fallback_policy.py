@@ -1,6 +1,9 @@
-from typing import Dict, List, Tuple, Type
+from typing import Dict, Tuple, Type
 import enum
 
+from policies import activity as activity_lib
+from utils import context
+
 
 class FallbackType(enum.Enum):
     OnDemand = "OnDemand"
@@ -13,6 +16,9 @@ class FallbackPolicy:
     NAME = "FallbackPolicy"
     REGISTRY: Dict[str, Type["FallbackPolicy"]] = dict()
 
+    def __init__(self, ctx: context.SimulationContext) -> None:
+        self.ctx = ctx
+
     def __init_subclass__(cls) -> None:
         if cls.NAME is None:
             return
@@ -28,8 +34,7 @@ class FallbackPolicy:
         self,
         t: int,
         i: int,
-        spot_plan: List[List[int]],
-        demand_plan: List[int],
+        activity: activity_lib.ActivityTracker,
         num_target,
         num_provision,
     ) -> Tuple[int, int]:
@@ -0,0 +1,134 @@
+"""Content-addressed cache of latency simulation results.
+
+A simulation only depends on the node-count timeline, the workload type, the
+client seeds and the simulator parameters, so identical timelines produced by
+different policies, traces or repeats share one result. Results are kept in a
+small in-process LRU and in a directory shared by every worker process; both
+are bounded and evict the least recently used entries first.
+"""
+
+import collections
+import hashlib
+import json
+import os
+from typing import Dict, Optional, OrderedDict, Tuple
+
+import numpy as np
+
+from utils import files
+from utils.quantile_sketch import LatencySketch
+
+# Bump when the simulator changes in a way that invalidates stored results.
+# Changes to the requests a workload generates bump its DATA_VERSION instead.
+_VERSION = 2
+
+# Caches opened by this process, keyed by directory.
+_CACHES: Dict[Optional[str], "LatencyCache"] = {}
+
+LatencyResult = Tuple[float, float, float, float, LatencySketch]
+
+
+def make_key(node_counts, workload_name: str, workload_data, seeds, **params) -> str:
+    """Hash of everything a latency simulation depends on.
+
+    `workload_data` identifies the requests the workload generates, see
+    `Workload.data_identity`.
+    """
+    digest = hashlib.sha256()
+    header = {
+        "version": _VERSION,
+        "workload": workload_name,
+        "workload_data": list(workload_data),
+        "seeds": list(seeds),
+        "params": params,
+    }
+    digest.update(json.dumps(header, sort_keys=True).encode())
+    digest.update(np.asarray(node_counts, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+class LatencyCache:
+    def __init__(
+        self, cache_dir: Optional[str], max_entries: int, max_bytes: int
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict[str, LatencyResult] = collections.OrderedDict()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[LatencyResult]:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            # Refresh the access time used for eviction.
+            os.utime(path)
+        except (OSError, ValueError):
+            # Missing, evicted by another process, or partially written.
+            return None
+        result = (*data["percentiles"], LatencySketch.from_dict(data["sketch"]))
+        self._remember(key, result)
+        return result
+
+    def put(self, key: str, result: LatencyResult) -> None:
+        self._remember(key, result)
+        if self.cache_dir is None:
+            return
+        *percentiles, sketch = result
+        data = {
+            "percentiles": [float(p) for p in percentiles],
+            "sketch": sketch.to_dict(),
+        }
+        files.atomic_write(self._path(key), lambda f: json.dump(data, f), mode="w")
+        self._evict_disk()
+
+    def _remember(self, key: str, result: LatencyResult) -> None:
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        entries = []
+        total_bytes = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_bytes -= size
+
+
+def get_cache(
+    cache_dir: Optional[str], max_entries: int, max_bytes: int
+) -> LatencyCache:
+    """Returns the cache of `cache_dir`, shared within this process.
+
+    A `cache_dir` of None keeps results in memory only.
+    """
+    if cache_dir not in _CACHES:
+        _CACHES[cache_dir] = LatencyCache(cache_dir, max_entries, max_bytes)
+    return _CACHES[cache_dir]
@@ -1,161 +1,573 @@
-from typing import List
+import collections
+import enum
+import functools
+import itertools
+import os
+from concurrent import futures
+from typing import Deque, Dict, List, NamedTuple, Optional
 
 import numpy as np
+import ray
 import simpy
 
+from policies import latency_cache, lindley, load_balancer, service_time
 from policies import workload as workload_lib
-from utils import config
+from utils import config, context, request_log
+from utils.quantile_sketch import LatencySketch
 
 NUM_CLIENTS = 3
 
 
-class CustomStore(simpy.Store):
-    def put_at_front(self, item):
-        self.items.insert(0, item)
+class LatencyEngineType(enum.Enum):
+    SimPy = "SimPy"
+    Lindley = "Lindley"
+
+
+class ReplicaModelType(enum.Enum):
+    SingleServer = "SingleServer"
+    ContinuousBatching = "ContinuousBatching"
+
+
+class Request(NamedTuple):
+    name: str
+    arrival_time: float
+    prompt_tokens: int
+    client_idx: int
+    # Number of nodes when the request arrived.
+    num_nodes: int
+
+
+class LatencyRecorder:
+    """Records the outcome of every request in a sketch and, if enabled, a log."""
+
+    def __init__(self, log: Optional[request_log.RequestLogWriter] = None) -> None:
+        self.sketch = LatencySketch()
+        self.log = log
+
+    def add(self, request: Request, latency, outcome, now, node=-1, start=np.nan):
+        self.sketch.add(latency)
+        if self.log is not None:
+            self.log.add(
+                request.arrival_time,
+                request.client_idx,
+                node,
+                request.num_nodes,
+                start,
+                now,
+                latency,
+                outcome,
+            )
 
 
 class NodesList:
-    def __init__(self) -> None:
+    def __init__(self, lb: load_balancer.LoadBalancer) -> None:
         self.nodes: List[Node] = []
-        pass
+        self.load_balancer = lb
+
+    def add(self, node: "Node") -> None:
+        self.nodes.append(node)
+        self.load_balancer.add_node(node)
+
+    def pop(self) -> "Node":
+        node = self.nodes.pop()
+        self.load_balancer.remove_node(node)
+        return node
 
 
 class Node:
-    def __init__(self, env, name, workload):
+    """A replica serving its FCFS queue one request at a time.
+
+    Each node runs its own process that pulls the next request as soon as the
+    previous one finishes, and sleeps on an event while its queue is empty,
+    so dispatch costs one event per request instead of periodic polling.
+    """
+
+    def __init__(
+        self, env, name, index, workload, recorder, lb, service_time_model=None
+    ):
         self.env = env
         self.name = name
-        self.queue = CustomStore(env)
+        self.index = index
+        self.queue: Deque[Request] = collections.deque()
         self.workload = workload
+        self.service_time_model = (
+            service_time_model
+            if service_time_model is not None
+            else service_time.Exponential(workload)
+        )
         self.busy = False
+        self.removed = False
+        # Queued plus in-flight requests, as seen by the load balancer.
+        self.outstanding = 0
+        self.load_balancer = lb
+        self._wakeup: Optional[simpy.Event] = None
+        env.process(self.run(recorder))
+
+    def put(self, request):
+        self.queue.append(request)
+        self._set_outstanding(self.outstanding + 1)
+        self._wake_up()
+
+    def put_many(self, requests):
+        num_before = len(self.queue)
+        self.queue.extend(requests)
+        if len(self.queue) > num_before:
+            self._set_outstanding(self.outstanding + len(self.queue) - num_before)
+            self._wake_up()
+
+    def remove(self):
+        """Stops the node once its in-flight request, if any, completes."""
+        self.removed = True
+        self._wake_up()
+
+    def _set_outstanding(self, outstanding):
+        self.outstanding = outstanding
+        self.load_balancer.update(self)
 
-    def serve_request(self, request, serving_times):
+    def _wake_up(self):
+        if self._wakeup is not None and not self._wakeup.triggered:
+            self._wakeup.succeed()
+
+    def run(self, recorder):
+        while not self.removed:
+            if not self.queue:
+                self._wakeup = self.env.event()
+                yield self._wakeup
+                self._wakeup = None
+                continue
+            request = self.queue.popleft()
+            yield from self.serve_request(request, recorder)
+            self._set_outstanding(self.outstanding - 1)
+
+    def serve_request(self, request, recorder):
         self.busy = True
-        start_time = request[1]  # Arrival time
+        start_time = request.arrival_time
         if self.env.now - start_time > self.workload.timeout:
             self.busy = False
-            serving_times.append(self.workload.timeout)
+            recorder.add(
+                request,
+                self.workload.timeout,
+                request_log.Outcome.TimedOut,
+                self.env.now,
+                node=self.index,
+            )
             return False
-        yield self.env.timeout(np.random.exponential(1 / self.workload.service_rate))
+        service_start = self.env.now
+        yield self.env.timeout(self.service_time_model.sample(request.prompt_tokens))
         end_time = self.env.now
-        serving_times.append(end_time - start_time)
+        recorder.add(
+            request,
+            end_time - start_time,
+            request_log.Outcome.Served,
+            end_time,
+            node=self.index,
+            start=service_start,
+        )
         self.busy = False
         return True
 
 
-# def _put_request_in_least_loaded_node(nodes, request):
-#     # Find the node with the shortest queue.
-#     # this parts departs from the e2e evaluation.
-#     node_length_list = [len(node.queue.items) for node in nodes.nodes]
-#     node_idx = np.argmin(node_length_list)
-#     node = nodes.nodes[node_idx]
+class BatchingNode(Node):
+    """A replica that decodes up to `max_batch_size` requests together.
+
+    Models continuous batching as in vLLM: queued requests join the batch at
+    the next decoding step while there is room, and every step advances all
+    running requests by one step but takes longer the fuller the batch is.
+    A request needs as many steps as fit in its single-request service time.
+    The node only wakes up when a request finishes or a new one can join, not
+    on every step.
+    """
 
-#     node.queue.put(request)
+    def __init__(
+        self,
+        env,
+        name,
+        index,
+        workload,
+        recorder,
+        lb,
+        max_batch_size,
+        step_time,
+        step_slowdown,
+        service_time_model=None,
+    ):
+        self.max_batch_size = max_batch_size
+        self.step_time = step_time
+        self.step_slowdown = step_slowdown
+        # [remaining steps, request, start time] of every running request.
+        self.batch: List[List[float]] = []
+        super().__init__(
+            env, name, index, workload, recorder, lb, service_time_model
+        )
 
+    def batch_step_time(self, batch_size):
+        return self.step_time * (1 + self.step_slowdown * (batch_size - 1))
 
-def client(env, nodes, workload, serving_times):
+    def _admit(self, recorder):
+        while self.queue and len(self.batch) < self.max_batch_size:
+            request = self.queue.popleft()
+            if self.env.now - request.arrival_time > self.workload.timeout:
+                recorder.add(
+                    request,
+                    self.workload.timeout,
+                    request_log.Outcome.TimedOut,
+                    self.env.now,
+                    node=self.index,
+                )
+                self._set_outstanding(self.outstanding - 1)
+                continue
+            service_seconds = self.service_time_model.sample(request.prompt_tokens)
+            num_steps = max(1, round(service_seconds / self.step_time))
+            self.batch.append([num_steps, request, self.env.now])
+
+    def run(self, recorder):
+        # A removed node still finishes the requests already in its batch.
+        while self.batch or not self.removed:
+            if not self.removed:
+                self._admit(recorder)
+            if not self.batch:
+                if self.removed:
+                    break
+                self._wakeup = self.env.event()
+                yield self._wakeup
+                self._wakeup = None
+                continue
+
+            self.busy = True
+            step_time = self.batch_step_time(len(self.batch))
+            min_steps = min(entry[0] for entry in self.batch)
+            start = self.env.now
+            done = self.env.timeout(min_steps * step_time)
+            can_admit = len(self.batch) < self.max_batch_size and not self.removed
+            if can_admit:
+                # Wake up early if a request arrives that could join.
+                self._wakeup = self.env.event()
+                yield done | self._wakeup
+                self._wakeup = None
+            else:
+                yield done
+            if done.processed:
+                num_steps = min_steps
+            else:
+                # Finish the step in progress before the batch changes.
+                num_steps = min(
+                    min_steps, int((self.env.now - start) // step_time) + 1
+                )
+                yield self.env.timeout(start + num_steps * step_time - self.env.now)
+
+            running = []
+            for request in self.batch:
+                request[0] -= num_steps
+                if request[0] <= 0:
+                    recorder.add(
+                        request[1],
+                        self.env.now - request[1].arrival_time,
+                        request_log.Outcome.Served,
+                        self.env.now,
+                        node=self.index,
+                        start=request[2],
+                    )
+                    self._set_outstanding(self.outstanding - 1)
+                else:
+                    running.append(request)
+            self.batch = running
+            self.busy = bool(self.batch)
+
+
+def client(env, nodes, workload, recorder, client_idx):
     i = 0
-    node_idx = 0
     while True:
         yield env.timeout(workload.get_next_interarrival_time(i))
+        prompt_tokens = workload.get_prompt_tokens(i)
         i += 1
-        request = (f"Request-{i + 1}", env.now)  # Include arrival time
+        request = Request(
+            f"Request-{i + 1}", env.now, prompt_tokens, client_idx, len(nodes.nodes)
+        )
 
         # If all nodes are preempted.
         if len(nodes.nodes) == 0:
-            serving_times.append(workload.timeout)
+            recorder.add(
+                request, workload.timeout, request_log.Outcome.TimedOut, env.now
+            )
             continue
 
-        # _put_request_in_least_loaded_node(nodes, request)
-        node = nodes.nodes[node_idx % len(nodes.nodes)]
-        node.queue.put(request)
-        node_idx += 1
+        nodes.load_balancer.select(client_idx).put(request)
 
 
-def server(env, nodes, serving_times):
-    while True:
-        for node in nodes.nodes:
-            # Serve requests if node is not busy and request in queue.
-            if not node.busy and len(node.queue.items) > 0:
-                request = node.queue.get().value
-                env.process(node.serve_request(request, serving_times))
-        yield env.timeout(0.01)
+def _drop_queue(node, recorder, workload):
+    now = node.env.now
+    while len(node.queue) > 0:
+        recorder.add(
+            node.queue.popleft(),
+            workload.timeout,
+            request_log.Outcome.Dropped,
+            now,
+            node=node.index,
+        )
+
 
+def redistribute_requests(nodes, dropped_node, recorder, workload):
+    """Retries the queued requests of a removed node on the remaining nodes.
 
-def adjust_nodes(env, nodes, node_counts, workload, serving_times):
+    Requests keep their arrival time and are moved in one contiguous chunk
+    per receiving node, as many as the load balancer assigns to it.
+    """
+    if len(nodes.nodes) == 0:
+        _drop_queue(dropped_node, recorder, workload)
+        return
+    requests = iter(dropped_node.queue)
+    counts = nodes.load_balancer.split(len(dropped_node.queue))
+    for node, count in zip(list(nodes.nodes), counts):
+        node.put_many(itertools.islice(requests, count))
+    dropped_node.queue.clear()
+
+
+def adjust_nodes(
+    env,
+    nodes,
+    node_counts,
+    workload,
+    recorder,
+    time_tick_in_seconds,
+    redistribute=False,
+    make_node=Node,
+):
     for _, count in enumerate(node_counts):
         if len(nodes.nodes) < count:
             while len(nodes.nodes) < count:
-                node = Node(
+                node = make_node(
                     env,
                     f"Node-{len(nodes.nodes) + 1}",
+                    index=len(nodes.nodes),
                     workload=workload,
+                    recorder=recorder,
+                    lb=nodes.load_balancer,
                 )
-                nodes.nodes.append(node)
+                nodes.add(node)
         elif count < len(nodes.nodes):
-            excess_nodes = nodes.nodes[count:]
-            nodes.nodes = nodes.nodes[:count]
-            for node in excess_nodes:
-                # redistribute_requests(nodes, node, serving_times, workload)
+            excess_nodes = [nodes.pop() for _ in range(len(nodes.nodes) - count)]
+            for node in reversed(excess_nodes):
+                node.remove()
+                if redistribute:
+                    redistribute_requests(nodes, node, recorder, workload)
+                    continue
 
                 # Timeout all the nodes.
-                while len(node.queue.items) > 0:
-                    node.queue.get().value
-                    serving_times.append(workload.timeout)
+                _drop_queue(node, recorder, workload)
 
         assert len(nodes.nodes) == count
-        yield env.timeout(config.time_tick_in_seconds)
-
+        yield env.timeout(time_tick_in_seconds)
 
-# def redistribute_requests(nodes, dropped_node, serving_times, workload):
-#     while len(dropped_node.queue.items) > 0:
-#         request = dropped_node.queue.get().value
-#         if len(nodes.nodes) == 0:
-#             serving_times.append(workload.timeout)
-#             continue
 
-#         _put_request_in_least_loaded_node(nodes, request)
-
-
-# Shift the time by i.
-def simulate_latency(node_counts, workload: workload_lib.Workload, i=0):
+def _simulate_simpy(
+    node_counts,
+    workloads,
+    time_tick_in_seconds,
+    until,
+    load_balancer_name,
+    redistribute,
+    make_node,
+    log=None,
+):
     env = simpy.Environment()
-    nodes: NodesList = NodesList()
-    serving_times: List[float] = list()
-    workloads = []
-    for i in range(NUM_CLIENTS):
-        workload = type(workload)(seed=i, use_simulator=True)
+    nodes = NodesList(load_balancer.LoadBalancer.from_name(load_balancer_name)())
+    recorder = LatencyRecorder(log)
+    for client_idx, workload in enumerate(workloads):
         env.process(
             client(
                 env,
                 nodes,
                 workload=workload,
-                serving_times=serving_times,
+                recorder=recorder,
+                client_idx=client_idx,
             )
         )
-        workloads.append(workload)
 
-    env.process(server(env, nodes, serving_times))
     env.process(
         adjust_nodes(
             env,
             nodes,
             node_counts=node_counts,
             workload=workloads[0],
-            serving_times=serving_times,
+            recorder=recorder,
+            time_tick_in_seconds=time_tick_in_seconds,
+            redistribute=redistribute,
+            make_node=make_node,
         )
     )
+    env.run(until=until)
+    return recorder.sketch
+
+
+def _arrival_times(workload: workload_lib.Workload, until):
+    """Arrival times and prompt lengths of one client's requests before `until`.
+
+    Generated as in `client`.
+    """
+    arrival_times = []
+    prompt_tokens = []
+    now = 0.0
+    i = 0
+    while True:
+        now += workload.get_next_interarrival_time(i)
+        if now >= until:
+            return arrival_times, prompt_tokens
+        arrival_times.append(now)
+        prompt_tokens.append(workload.get_prompt_tokens(i))
+        i += 1
+
+
+def _simulate_lindley(
+    node_counts, workloads, time_tick_in_seconds, until, service_time_model, log=None
+):
+    per_client = [_arrival_times(workload, until) for workload in workloads]
+    arrival_times = np.concatenate([arrivals for arrivals, _ in per_client])
+    prompt_tokens = np.concatenate([tokens for _, tokens in per_client])
+    client_ids = np.repeat(
+        np.arange(len(workloads)), [len(arrivals) for arrivals, _ in per_client]
+    )
+    order = np.argsort(arrival_times, kind="stable")
+    arrival_times, client_ids = arrival_times[order], client_ids[order]
+    service_times = service_time_model.sample_many(prompt_tokens[order])
+    latencies, _, events = lindley.simulate(
+        arrival_times,
+        client_ids,
+        service_times,
+        node_counts,
+        time_tick_in_seconds,
+        workloads[0].timeout,
+        until,
+        return_events=True,
+    )
+    if log is not None:
+        log.add_many(**events)
+    return LatencySketch.from_values(latencies)
+
+
+class LatencyParams(NamedTuple):
+    """Simulator settings shipped to worker processes instead of the context."""
+
+    latency_engine: str
+    load_balancer: str
+    redistribute_requests: bool
+    replica_model: str
+    max_batch_size: int
+    batch_step_time: float
+    batch_step_slowdown: float
+    service_time_model: str
+    prefill_time_per_token: float
+    decode_time_per_token: float
+    output_len_distribution: str
+    output_len_mean: float
+    output_len_max: int
+    time_tick_in_seconds: int
+    service_rate: float
+    timeout: float
+
+    @classmethod
+    def from_context(cls, ctx: context.SimulationContext, workload):
+        return cls(
+            latency_engine=LatencyEngineType(ctx.latency_engine).value,
+            load_balancer=load_balancer.LoadBalancerType(ctx.load_balancer).value,
+            redistribute_requests=ctx.redistribute_requests,
+            replica_model=ReplicaModelType(ctx.replica_model).value,
+            max_batch_size=ctx.max_batch_size,
+            batch_step_time=ctx.batch_step_time,
+            batch_step_slowdown=ctx.batch_step_slowdown,
+            service_time_model=service_time.ServiceTimeModelType(
+                ctx.service_time_model
+            ).value,
+            prefill_time_per_token=ctx.prefill_time_per_token,
+            decode_time_per_token=ctx.decode_time_per_token,
+            output_len_distribution=service_time.OutputLenDistribution(
+                ctx.output_len_distribution
+            ).value,
+            output_len_mean=ctx.output_len_mean,
+            output_len_max=ctx.output_len_max,
+            time_tick_in_seconds=ctx.time_tick_in_seconds,
+            service_rate=workload.service_rate,
+            timeout=workload.timeout,
+        )
+
+
+def _make_service_time_model(params: LatencyParams, workload):
+    return service_time.ServiceTimeModel.from_name(params.service_time_model)(
+        workload,
+        prefill_time_per_token=params.prefill_time_per_token,
+        decode_time_per_token=params.decode_time_per_token,
+        output_len_distribution=params.output_len_distribution,
+        output_len_mean=params.output_len_mean,
+        output_len_max=params.output_len_max,
+    )
+
+
+def _make_node_factory(params: LatencyParams, service_time_model):
+    if ReplicaModelType(params.replica_model) == ReplicaModelType.SingleServer:
+        return functools.partial(Node, service_time_model=service_time_model)
+    return functools.partial(
+        BatchingNode,
+        max_batch_size=params.max_batch_size,
+        step_time=params.batch_step_time,
+        step_slowdown=params.batch_step_slowdown,
+        service_time_model=service_time_model,
+    )
+
+
+def _run_simulation(
+    node_counts, workload_cls, params: LatencyParams, request_log_dir=None
+):
+    # Client workloads are seeded by client index only, so a timeline gives
+    # the same result in any process and in any order.
+    workloads = [workload_cls(seed=i, use_simulator=True) for i in range(NUM_CLIENTS)]
 
     print(
         f"Running simulation for {len(node_counts)} time periods, {node_counts[:50]}, average: {sum(node_counts) / len(node_counts)}"
     )
-    # print(len(node_counts) * config.time_tick_in_seconds + 1)
-    env.run(until=len(node_counts) * config.time_tick_in_seconds + 1)
-    assert len(serving_times) >= 1, node_counts
-    average_latency = np.average(serving_times)
-    p99_latency = np.percentile(serving_times, 99)
-    p90_latency = np.percentile(serving_times, 90)
-    p50_latency = np.percentile(serving_times, 50)
-    p999_latency = np.percentile(serving_times, 99.9)
+    until = len(node_counts) * params.time_tick_in_seconds + 1
+    log = (
+        request_log.RequestLogWriter(request_log_dir)
+        if request_log_dir is not None
+        else None
+    )
+    # Nodes draw service times from the first client's random engine.
+    service_time_model = _make_service_time_model(params, workloads[0])
+    if LatencyEngineType(params.latency_engine) == LatencyEngineType.Lindley:
+        # The recursion relies on every client round-robining on its own.
+        assert (
+            load_balancer.LoadBalancerType(params.load_balancer)
+            == load_balancer.LoadBalancerType.RoundRobin
+        ), params.load_balancer
+        assert not params.redistribute_requests
+        assert (
+            ReplicaModelType(params.replica_model) == ReplicaModelType.SingleServer
+        ), params.replica_model
+        serving_times = _simulate_lindley(
+            node_counts,
+            workloads,
+            params.time_tick_in_seconds,
+            until,
+            service_time_model,
+            log,
+        )
+    else:
+        serving_times = _simulate_simpy(
+            node_counts,
+            workloads,
+            params.time_tick_in_seconds,
+            until,
+            params.load_balancer,
+            params.redistribute_requests,
+            _make_node_factory(params, service_time_model),
+            log,
+        )
+    if log is not None:
+        log.close()
+    assert serving_times.count >= 1, node_counts
+    average_latency = serving_times.mean
+    p99_latency = serving_times.percentile(99)
+    p90_latency = serving_times.percentile(90)
+    p50_latency = serving_times.percentile(50)
+    p999_latency = serving_times.percentile(99.9)
 
     print(
         f"average_latency: {average_latency}, p50_latency: {p50_latency:.2f}, p90_latency: {p90_latency:.2f}, p99_latency: {p99_latency:.2f}, P999: {p999_latency:.2f}"
@@ -165,5 +577,130 @@ def simulate_latency(node_counts, workload: workload_lib.Workload, i=0):
         p90_latency,
         p99_latency,
         p999_latency,
-        serving_times[0 : len(serving_times) : 10],
+        serving_times,
+    )
+
+
+_run_simulation_remote = ray.remote(num_cpus=1)(_run_simulation)
+
+
+def _run_simulations(
+    node_counts_list, workload_cls, params, max_workers, request_log_dirs
+):
+    if len(node_counts_list) <= 1 or max_workers == 1:
+        return [
+            _run_simulation(node_counts, workload_cls, params, log_dir)
+            for node_counts, log_dir in zip(node_counts_list, request_log_dirs)
+        ]
+    # Under eval.eval every experiment already is a Ray task, so fan out as
+    # Ray tasks instead of forking inside a Ray worker.
+    if ray.is_initialized():
+        return ray.get(
+            [
+                _run_simulation_remote.remote(
+                    node_counts, workload_cls, params, log_dir
+                )
+                for node_counts, log_dir in zip(node_counts_list, request_log_dirs)
+            ]
+        )
+    with futures.ProcessPoolExecutor(
+        max_workers=min(len(node_counts_list), max_workers or os.cpu_count())
+    ) as pool:
+        return list(
+            pool.map(
+                _run_simulation,
+                node_counts_list,
+                [workload_cls] * len(node_counts_list),
+                [params] * len(node_counts_list),
+                request_log_dirs,
+            )
+        )
+
+
+def _cache_keys(node_counts_list, workload, params: LatencyParams):
+    return [
+        latency_cache.make_key(
+            node_counts,
+            workload.name.value,
+            workload.data_identity,
+            range(NUM_CLIENTS),
+            **params._asdict(),
+        )
+        for node_counts in node_counts_list
+    ]
+
+
+def _request_log_dir(ctx: context.SimulationContext, key: str) -> Optional[str]:
+    if ctx.request_log_dir is None:
+        return None
+    return os.path.join(ctx.request_log_dir, key)
+
+
+def request_log_dirs(
+    node_counts_list, workload: workload_lib.Workload, ctx: context.SimulationContext
+) -> List[Optional[str]]:
+    """Where `simulate_latencies` exports the requests of every timeline.
+
+    Logs are named by the same hash as cached results, so identical
+    timelines share one log. All None unless `ctx.request_log_dir` is set.
+    """
+    keys = _cache_keys(
+        node_counts_list, workload, LatencyParams.from_context(ctx, workload)
+    )
+    return [_request_log_dir(ctx, key) for key in keys]
+
+
+def simulate_latencies(
+    node_counts_list,
+    workload: workload_lib.Workload,
+    ctx: context.SimulationContext,
+):
+    """Simulates the latency of every timeline, running misses in parallel.
+
+    Returns (p50, p90, p99, p999, sketch) for each timeline, in order.
+    """
+    cache = latency_cache.get_cache(
+        ctx.latency_cache_dir,
+        config.latency_cache_max_entries,
+        config.latency_cache_max_bytes,
     )
+    params = LatencyParams.from_context(ctx, workload)
+    keys = _cache_keys(node_counts_list, workload, params)
+    log_dirs = [_request_log_dir(ctx, key) for key in keys]
+    results = [
+        # A cached result is only enough if its requests were exported too.
+        cache.get(key) if log_dir is None or request_log.exists(log_dir) else None
+        for key, log_dir in zip(keys, log_dirs)
+    ]
+
+    # Identical timelines within the batch are only simulated once.
+    missing: Dict[str, List[int]] = collections.defaultdict(list)
+    for idx, (key, result) in enumerate(zip(keys, results)):
+        if result is None:
+            missing[key].append(idx)
+        else:
+            print(
+                f"Reusing latency simulation for {len(node_counts_list[idx])} time periods"
+            )
+    computed = _run_simulations(
+        [node_counts_list[indices[0]] for indices in missing.values()],
+        type(workload),
+        params,
+        ctx.latency_workers,
+        [log_dirs[indices[0]] for indices in missing.values()],
+    )
+    for (key, indices), result in zip(missing.items(), computed):
+        cache.put(key, result)
+        for idx in indices:
+            results[idx] = result
+    return results
+
+
+def simulate_latency(
+    node_counts,
+    workload: workload_lib.Workload,
+    ctx: context.SimulationContext,
+    i=0,
+):
+    del i  # Results do not depend on the repeat.
+    return simulate_latencies([node_counts], workload, ctx)[0]
@@ -0,0 +1,213 @@
+"""Vectorized latency engine based on the Lindley recursion.
+
+Between two replica-count changes every node is a single-server FCFS queue
+fed round-robin, so the start time of a request is
+
+    start_k = P_k + max_{j <= k} (A_j - P_j)
+
+where A are arrival times and P is the prefix sum of the service consumed by
+earlier requests on the same node. Nodes are split into incarnations: node
+`j` is recreated empty whenever the count drops to `j` or below and comes
+back, and requests still queued on it when it is removed are dropped. This
+mirrors `latency_simulator` without simulating individual events.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from utils import request_log
+
+# Vectorized passes over the skip guesses before resolving them sequentially.
+_MAX_SKIP_PASSES = 4
+
+
+def _segmented_running_max(values: np.ndarray, group: np.ndarray) -> np.ndarray:
+    """Running maximum of `values` that restarts whenever `group` changes.
+
+    `group` must be non-decreasing. Every group is shifted above the previous
+    one so that a single cumulative maximum never carries across groups.
+    """
+    if len(values) == 0:
+        return values
+    shift = values.max() - values.min() + 1
+    offset = group * shift
+    return np.maximum.accumulate(values + offset) - offset
+
+
+def _resolve_skips(
+    arrivals: np.ndarray,
+    services: np.ndarray,
+    group: np.ndarray,
+    timeout: float,
+    start: np.ndarray,
+    skipped: np.ndarray,
+    first: int,
+) -> None:
+    """Sequential Lindley recursion from request `first` on, in place.
+
+    `start` and `skipped` must be exact before `first`.
+    """
+    arrival_list = arrivals[first:].tolist()
+    service_list = services[first:].tolist()
+    group_list = group[first:].tolist()
+    if first > 0 and group[first - 1] == group[first]:
+        free = start[first - 1] + (0.0 if skipped[first - 1] else services[first - 1])
+    else:
+        free = -np.inf
+    prev_group = group_list[0]
+    new_start = []
+    new_skipped = []
+    for arrival, service, g in zip(arrival_list, service_list, group_list):
+        if g != prev_group:
+            free = -np.inf
+            prev_group = g
+        begin = arrival if arrival > free else free
+        skip = begin - arrival > timeout
+        free = begin if skip else begin + service
+        new_start.append(begin)
+        new_skipped.append(skip)
+    start[first:] = new_start
+    skipped[first:] = new_skipped
+
+
+def _incarnations(
+    node_counts: np.ndarray, segment: np.ndarray, node_idx: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Birth and death segment of the node incarnation serving each request.
+
+    Node `j` is alive in segment `s` iff node_counts[s] > j. The death segment
+    is len(node_counts) if the node survives until the end.
+    """
+    num_segments = len(node_counts)
+    max_nodes = int(node_counts.max())
+    segments = np.arange(num_segments)
+    # low[j, s]: node j does not exist in segment s.
+    low = node_counts[None, :] <= np.arange(max_nodes)[:, None]
+    last_low = np.maximum.accumulate(np.where(low, segments, -1), axis=1)
+    next_low = np.minimum.accumulate(
+        np.where(low, segments, num_segments)[:, ::-1], axis=1
+    )[:, ::-1]
+    birth = last_low[node_idx, segment] + 1
+    death = next_low[node_idx, segment]
+    return birth, death
+
+
+def _rank_within(client_ids: np.ndarray) -> np.ndarray:
+    """Position of every element among the earlier elements of its client."""
+    order = np.argsort(client_ids, kind="stable")
+    sorted_ids = client_ids[order]
+    first = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    group_sizes = np.diff(np.r_[first, len(order)])
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - np.repeat(first, group_sizes)
+    return rank
+
+
+def simulate(
+    arrival_times: np.ndarray,
+    client_ids: np.ndarray,
+    service_times: np.ndarray,
+    node_counts,
+    time_tick_in_seconds: float,
+    timeout: float,
+    horizon: float,
+    return_events: bool = False,
+) -> Tuple:
+    """Latency of every request that finishes (or is timed out) before `horizon`.
+
+    `arrival_times` must be sorted; `client_ids[k]` is the client that sent
+    request `k`, as every client round-robins over the nodes on its own.
+    `service_times[k]` is only consumed if request `k` is served. A request
+    waiting longer than `timeout` when it reaches the head of its queue,
+    arriving while no node is up, or still queued on a node that is removed
+    counts as `timeout`.
+
+    Returns the latencies and the simulated time at which each one would have
+    been recorded, both ordered by that time. With `return_events`, also
+    returns the columns of a `request_log` in the same order.
+    """
+    node_counts = np.asarray(node_counts, dtype=np.int64)
+    arrival_times = np.asarray(arrival_times, dtype=np.float64)
+    service_times = np.asarray(service_times, dtype=np.float64)
+    num_requests = len(arrival_times)
+    latencies = np.full(num_requests, float(timeout))
+    record_times = arrival_times.copy()
+    nodes = np.full(num_requests, -1, dtype=np.int64)
+    starts = np.full(num_requests, np.nan)
+    outcomes = np.full(num_requests, request_log.Outcome.TimedOut, dtype=np.int8)
+
+    segment = np.minimum(
+        (arrival_times // time_tick_in_seconds).astype(np.int64), len(node_counts) - 1
+    )
+    count = node_counts[segment]
+    routed = np.flatnonzero(count > 0)
+    if len(routed) > 0:
+        # Round-robin only advances for requests that reach a node.
+        node_idx = _rank_within(np.asarray(client_ids)[routed]) % count[routed]
+        birth, death = _incarnations(node_counts, segment[routed], node_idx)
+
+        # Group requests by node incarnation, keeping arrival order inside.
+        key = birth * (int(node_counts.max()) + 1) + node_idx
+        order = np.argsort(key, kind="stable")
+        requests = routed[order]
+        group = np.cumsum(np.r_[0, np.diff(key[order]) != 0])
+        arrivals = arrival_times[requests]
+        services = service_times[requests]
+
+        # A request is skipped without consuming service if it waited longer
+        # than the timeout. Fix the first wrong guess and re-guess everything
+        # after it; the prefix before the first mismatch is always exact. This
+        # converges in a few passes unless queues overflow, where every pass
+        # only fixes one skip, so after a few passes the rest is resolved
+        # sequentially in one linear pass.
+        skipped = np.zeros(len(requests), dtype=bool)
+        for _ in range(_MAX_SKIP_PASSES):
+            consumed = np.where(skipped, 0.0, services)
+            prefix = np.cumsum(consumed) - consumed
+            start = prefix + _segmented_running_max(arrivals - prefix, group)
+            should_skip = start - arrivals > timeout
+            mismatch = np.flatnonzero(should_skip != skipped)
+            if len(mismatch) == 0:
+                break
+            skipped[mismatch[0] :] = should_skip[mismatch[0] :]
+        else:
+            _resolve_skips(
+                arrivals, services, group, timeout, start, skipped, mismatch[0]
+            )
+
+        death_time = np.where(
+            death[order] < len(node_counts),
+            death[order] * time_tick_in_seconds,
+            np.inf,
+        )
+        dropped = start > death_time
+        served = ~skipped & ~dropped
+        latencies[requests[served]] = (
+            start[served] + services[served] - arrivals[served]
+        )
+        record_times[requests] = np.where(
+            dropped, death_time, np.where(skipped, start, start + services)
+        )
+        nodes[routed] = node_idx
+        starts[requests[served]] = start[served]
+        outcomes[requests[served]] = request_log.Outcome.Served
+        outcomes[requests[dropped]] = request_log.Outcome.Dropped
+
+    finished = record_times < horizon
+    order = np.flatnonzero(finished)[
+        np.argsort(record_times[finished], kind="stable")
+    ]
+    if not return_events:
+        return latencies[order], record_times[order]
+    events = {
+        "arrival": arrival_times[order],
+        "client": np.asarray(client_ids)[order],
+        "node": nodes[order],
+        "num_nodes": count[order],
+        "start": starts[order],
+        "end": record_times[order],
+        "latency": latencies[order],
+        "outcome": outcomes[order],
+    }
+    return latencies[order], record_times[order], events
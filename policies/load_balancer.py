@@ -0,0 +1,163 @@
+import enum
+import heapq
+import random
+from typing import Dict, List, Tuple, Type
+
+import numpy as np
+
+
+class LoadBalancerType(enum.Enum):
+    RoundRobin = "RoundRobin"
+    LeastLoaded = "LeastLoaded"
+    PowerOfTwo = "PowerOfTwo"
+    Random = "Random"
+
+
+class LoadBalancer:
+    """Routes requests of the latency simulator's clients to nodes.
+
+    The simulator calls `add_node`/`remove_node` when the replica count
+    changes and `update` whenever the number of outstanding requests of a
+    node changes, so strategies can keep their own index over the nodes.
+    Nodes only ever leave from the end of the list, so a node keeps its
+    position for as long as it exists.
+    """
+
+    NAME = "LoadBalancer"
+    REGISTRY: Dict[str, Type["LoadBalancer"]] = dict()
+
+    def __init__(self, seed: int = 0) -> None:
+        self.nodes: List = []
+        self.random = random.Random(seed)
+
+    def __init_subclass__(cls) -> None:
+        if cls.NAME is None:
+            return
+        assert cls.NAME not in cls.REGISTRY, f"Name {cls.NAME} already exists"
+        cls.REGISTRY[cls.NAME] = cls
+
+    @classmethod
+    def from_name(cls, name):
+        name = LoadBalancerType(name)
+        assert name in cls.REGISTRY, (name, cls.REGISTRY)
+        return cls.REGISTRY[name]
+
+    def add_node(self, node) -> None:
+        self.nodes.append(node)
+
+    def remove_node(self, node) -> None:
+        assert self.nodes[-1] is node
+        self.nodes.pop()
+
+    def update(self, node) -> None:
+        pass
+
+    def select(self, client_idx: int):
+        """Returns the node for the next request of a client."""
+        raise NotImplementedError
+
+    def split(self, num_requests: int) -> List[int]:
+        """Number of retried requests to move onto each node, in bulk.
+
+        Spreads them evenly, with the remainder going to the first nodes.
+        """
+        base, remainder = divmod(num_requests, len(self.nodes))
+        return [base + (idx < remainder) for idx in range(len(self.nodes))]
+
+    @property
+    def name(self):
+        return f"{self.NAME}"
+
+
+class RoundRobin(LoadBalancer):
+    """Every client cycles over the nodes on its own, as in the e2e client."""
+
+    NAME = LoadBalancerType.RoundRobin
+
+    def __init__(self, seed: int = 0) -> None:
+        super().__init__(seed)
+        self.next_idx: Dict[int, int] = {}
+
+    def select(self, client_idx: int):
+        idx = self.next_idx.get(client_idx, 0)
+        self.next_idx[client_idx] = idx + 1
+        return self.nodes[idx % len(self.nodes)]
+
+
+class LeastLoaded(LoadBalancer):
+    """Picks the node with the fewest outstanding requests, lowest index first.
+
+    Keeps a heap of (load, index) entries with lazy deletion: every load
+    change pushes a fresh entry and outdated ones are discarded when they
+    reach the top, so routing costs O(log n) instead of a scan over nodes.
+    """
+
+    NAME = LoadBalancerType.LeastLoaded
+
+    def __init__(self, seed: int = 0) -> None:
+        super().__init__(seed)
+        self.heap: List[Tuple[int, int]] = []
+        self.loads: List[int] = []
+
+    def add_node(self, node) -> None:
+        super().add_node(node)
+        self.loads.append(node.outstanding)
+        heapq.heappush(self.heap, (node.outstanding, len(self.nodes) - 1))
+
+    def remove_node(self, node) -> None:
+        super().remove_node(node)
+        self.loads.pop()
+
+    def update(self, node) -> None:
+        idx = node.index
+        if idx >= len(self.nodes) or self.nodes[idx] is not node:
+            return
+        self.loads[idx] = node.outstanding
+        heapq.heappush(self.heap, (node.outstanding, idx))
+        if len(self.heap) > 4 * len(self.nodes) + 16:
+            self.heap = [(load, idx) for idx, load in enumerate(self.loads)]
+            heapq.heapify(self.heap)
+
+    def select(self, client_idx: int):
+        while True:
+            load, idx = self.heap[0]
+            if idx < len(self.nodes) and self.loads[idx] == load:
+                return self.nodes[idx]
+            heapq.heappop(self.heap)
+
+    def split(self, num_requests: int) -> List[int]:
+        """Fills the least loaded nodes up to a common level."""
+        loads = np.asarray(self.loads, dtype=np.int64)
+        order = np.argsort(loads, kind="stable")
+        sorted_loads = loads[order]
+        # Requests needed to lift the k least loaded nodes to the k-th load.
+        needed = np.arange(1, len(loads) + 1) * sorted_loads - np.cumsum(
+            sorted_loads
+        )
+        num_filled = int(np.searchsorted(needed, num_requests, side="right"))
+        level, remainder = divmod(
+            num_requests + int(sorted_loads[:num_filled].sum()), num_filled
+        )
+        counts = np.zeros(len(loads), dtype=np.int64)
+        counts[order[:num_filled]] = level - sorted_loads[:num_filled]
+        counts[order[:remainder]] += 1
+        return counts.tolist()
+
+
+class PowerOfTwo(LoadBalancer):
+    """Picks the less loaded of two nodes sampled at random."""
+
+    NAME = LoadBalancerType.PowerOfTwo
+
+    def select(self, client_idx: int):
+        if len(self.nodes) == 1:
+            return self.nodes[0]
+        first, second = self.random.sample(self.nodes, 2)
+        return first if first.outstanding <= second.outstanding else second
+
+
+class Random(LoadBalancer):
+    NAME = LoadBalancerType.Random
+
+    def select(self, client_idx: int):
+        return self.nodes[self.random.randrange(len(self.nodes))]
@@ -0,0 +1,77 @@
+from typing import Sequence
+
+import numpy as np
+
+
+class SpotPlan:
+    """Number of spot replicas requested in each region at each tick.
+
+    Backed by one preallocated int32 [T, R] array that is reused across
+    repeats. Row sums are cached and kept up to date by the mutators below, so
+    rows returned by indexing are read-only views.
+    """
+
+    def __init__(self, num_ticks: int, num_regions: int) -> None:
+        self._data = np.zeros((num_ticks, num_regions), dtype=np.int32)
+        self._row_sums = np.zeros(num_ticks, dtype=np.int64)
+
+    def reset(self) -> None:
+        self._data.fill(0)
+        self._row_sums.fill(0)
+
+    def __len__(self) -> int:
+        return self._data.shape[0]
+
+    def __getitem__(self, t: int) -> np.ndarray:
+        row = self._data[t]
+        row.flags.writeable = False
+        return row
+
+    @property
+    def num_regions(self) -> int:
+        return self._data.shape[1]
+
+    def row_sum(self, t: int) -> int:
+        return int(self._row_sums[t])
+
+    def add(self, t: int, region_idx: int, num: int = 1) -> None:
+        self._data[t, region_idx] += num
+        self._row_sums[t] += num
+
+    def clear_row(self, t: int) -> None:
+        self._data[t] = 0
+        self._row_sums[t] = 0
+
+    def copy_row(self, src: int, dst: int) -> None:
+        self._data[dst] = self._data[src]
+        self._row_sums[dst] = self._row_sums[src]
+
+    def clamp_row(self, t: int, max_num_spots: Sequence[int]) -> None:
+        """Caps every region of tick `t` at the number of available spots."""
+        np.minimum(self._data[t], max_num_spots, out=self._data[t])
+        self._row_sums[t] = self._data[t].sum()
+
+    def as_array(self) -> np.ndarray:
+        return self._data
+
+
+class DemandPlan:
+    """Number of on-demand replicas requested at each tick."""
+
+    def __init__(self, num_ticks: int) -> None:
+        self._data = np.zeros(num_ticks, dtype=np.int32)
+
+    def reset(self) -> None:
+        self._data.fill(0)
+
+    def __len__(self) -> int:
+        return self._data.shape[0]
+
+    def __getitem__(self, t: int) -> int:
+        return int(self._data[t])
+
+    def set(self, t: int, num_demand: int) -> None:
+        self._data[t] = num_demand
+
+    def as_array(self) -> np.ndarray:
+        return self._data
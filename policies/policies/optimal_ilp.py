@@ -4,17 +4,16 @@ from typing import Dict
 
 import pulp
 
-from policies import latency_simulator, spot_policy
-from utils import config, utils
+from policies import spot_policy
 from policies.spot_policy import SpotPolicyType
 
 
 class Optimal(spot_policy.Policy):
     NAME = SpotPolicyType.Optimal
 
-    def __init__(self, args, verbose=False) -> None:
-        super().__init__(args)
-        self.soft_target = config.target_num_instances + args.overprovision_num
+    def __init__(self, args, ctx, verbose=False) -> None:
+        super().__init__(args, ctx)
+        self.soft_target = ctx.target_num_instances + args.overprovision_num
         self._verbose = verbose
         self._results_dir = args.results_dir
         self._workload_str = args.workload
@@ -23,11 +22,11 @@ class Optimal(spot_policy.Policy):
     def _run_exp_one(self, i: int):
         spot_variables = []
         active_spot_instance_variables = []
-        num_regions = len(config.regions)
+        num_regions = len(self.ctx.regions)
         tic = time.time()
 
         print(
-            f"_run_exp_one_slo max_cost: {self._cost_cap}, slo: {config.slo}, step: {int(config.target_num_instances * config.total_time_period / 2)}, config.total_time_period: {config.total_time_period}"
+            f"_run_exp_one_slo max_cost: {self._cost_cap}, slo: {self.ctx.slo}, step: {int(self.ctx.target_num_instances * self.ctx.total_time_period / 2)}, self.ctx.total_time_period: {self.ctx.total_time_period}"
         )
 
         # prob = pulp.LpProblem("Service-Maximization", pulp.LpMaximize)
@@ -36,7 +35,7 @@ class Optimal(spot_policy.Policy):
             spot_variables.append(
                 pulp.LpVariable.dicts(
                     f"r{region_idx}",
-                    range(config.total_time_period),
+                    range(self.ctx.total_time_period),
                     lowBound=0,
                     upBound=self.soft_target,
                     cat=pulp.LpInteger,
@@ -45,7 +44,7 @@ class Optimal(spot_policy.Policy):
             active_spot_instance_variables.append(
                 pulp.LpVariable.dicts(
                     f"a{region_idx}",
-                    range(config.total_time_period),
+                    range(self.ctx.total_time_period),
                     lowBound=0,
                     upBound=self.soft_target,
                     cat=pulp.LpInteger,
@@ -54,7 +53,7 @@ class Optimal(spot_policy.Policy):
 
         on_demand_variables = pulp.LpVariable.dicts(
             "on_demand",
-            range(config.total_time_period),
+            range(self.ctx.total_time_period),
             lowBound=0,
             upBound=self.soft_target,
             cat=pulp.LpInteger,
@@ -62,7 +61,7 @@ class Optimal(spot_policy.Policy):
 
         active_on_demand_variables = pulp.LpVariable.dicts(
             "active_on_demand",
-            range(config.total_time_period),
+            range(self.ctx.total_time_period),
             lowBound=0,
             upBound=self.soft_target,
             cat=pulp.LpInteger,
@@ -70,19 +69,20 @@ class Optimal(spot_policy.Policy):
         
         num_active_at_t = pulp.LpVariable.dicts(
             "num_active_at_t",
-            range(config.total_time_period),
+            range(self.ctx.total_time_period),
             lowBound=0,
             upBound=self.soft_target,
             cat=pulp.LpInteger,
         )
 
-        for t in range(config.total_time_period):
-            for r, _ in enumerate(config.regions):
-                prob += spot_variables[r][t] <= utils.num_available_spot(r, t, i)
+        available_spots = self.available_spots.tolist()
+        for t in range(self.ctx.total_time_period):
+            for r, _ in enumerate(self.ctx.regions):
+                prob += spot_variables[r][t] <= available_spots[t][r]
 
                 # Check for active number of spot instances
-                if t >= config.cold_start_delay:
-                    for t_past in range(t - config.cold_start_delay, t + 1):
+                if t >= self.ctx.cold_start_delay:
+                    for t_past in range(t - self.ctx.cold_start_delay, t + 1):
                         prob += (
                             active_spot_instance_variables[r][t]
                             <= spot_variables[r][t_past]
@@ -90,8 +90,8 @@ class Optimal(spot_policy.Policy):
                 else:
                     prob += active_spot_instance_variables[r][t] <= 0
 
-            if t >= config.cold_start_delay:
-                for t_past in range(t - config.cold_start_delay, t + 1):
+            if t >= self.ctx.cold_start_delay:
+                for t_past in range(t - self.ctx.cold_start_delay, t + 1):
                     prob += active_on_demand_variables[t] <= on_demand_variables[t_past]
             else:
                 prob += active_on_demand_variables[t] <= 0
@@ -104,19 +104,19 @@ class Optimal(spot_policy.Policy):
                 + active_on_demand_variables[t]
             )
 
-            if t >= config.cold_start_delay:
+            if t >= self.ctx.cold_start_delay:
                 prob += num_active_at_t[t] <= self.soft_target
-                prob += num_active_at_t[t] >= config.target_num_instances
+                prob += num_active_at_t[t] >= self.ctx.target_num_instances
 
         cost = (
             pulp.lpSum(
                 pulp.lpSum(spot_variables[r][t] for r in range(num_regions))
-                for t in range(config.total_time_period)
+                for t in range(self.ctx.total_time_period)
             )
             + pulp.lpSum(
-                on_demand_variables[t] for t in range(config.total_time_period)
+                on_demand_variables[t] for t in range(self.ctx.total_time_period)
             )
-            * config.cost_demand
+            * self.ctx.cost_demand
         )
         # prob += cost <= self._cost_cap
         prob += cost, "Total Cost"
@@ -150,20 +150,20 @@ class Optimal(spot_policy.Policy):
 
         active_on_demand_list = [
             active_on_demand_variables[t].value()
-            for t in range(config.total_time_period)
+            for t in range(self.ctx.total_time_period)
         ]
         active_spot_list = [
             [active_spot_instance_variables[r][t].value() for r in range(num_regions)]
-            for t in range(config.total_time_period)
+            for t in range(self.ctx.total_time_period)
         ]
 
         total_active_list = [
             int(sum(active_spot_list[i]) + active_on_demand_list[i])
-            for i in range(config.total_time_period)
+            for i in range(self.ctx.total_time_period)
         ]
 
         nodes_to_count: Dict[int, int] = {}
-        for t in range(config.total_time_period):
+        for t in range(self.ctx.total_time_period):
             nodes_to_count[total_active_list[t]] = (
                 nodes_to_count.get(total_active_list[t], 0) + 1
             )
@@ -176,20 +176,11 @@ class Optimal(spot_policy.Policy):
             f", nodes_to_count: {nodes_to_count}"
         )
 
-        p50, p90, p99, p999, latency_list = latency_simulator.simulate_latency(
-            total_active_list, self.workload, i
-        )
-
         new_result = {
             "repeat_idx": i,
             "availability": avail,
             "cost": cost,
             "cost_cap": self._cost_cap,
             "node_hist": nodes_to_count,
-            "p50": p50,
-            "p90": p90,
-            "p99": p99,
-            "p999": p999,
-            "latency_list": latency_list,
         }
-        self._results.append(new_result)
+        self._add_result(new_result, total_active_list)
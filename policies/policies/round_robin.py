@@ -1,13 +1,12 @@
 from policies import spot_policy
-from utils import config
 from policies.spot_policy import SpotPolicyType
 
 
 class RoundRobin(spot_policy.Policy):
     NAME = SpotPolicyType.RoundRobin
 
-    def __init__(self, args) -> None:
-        super().__init__(args)
+    def __init__(self, args, ctx) -> None:
+        super().__init__(args, ctx)
         self.last_zone_idx = 0
 
     def _reset(self) -> None:
@@ -15,14 +14,14 @@ class RoundRobin(spot_policy.Policy):
         self.last_zone_idx = 0
 
     def _get_next_allocation(self, t, i, num_spots):
-        if num_spots < sum(self.spot_plan[t - 1]):
+        if num_spots < self.spot_plan.row_sum(t - 1):
             available_spot_to_redistribute = num_spots
-            self.spot_plan[t] = [0] * len(config.regions)
+            self.spot_plan.clear_row(t)
         else:
-            available_spot_to_redistribute = num_spots - sum(self.spot_plan[t - 1])
-            self.spot_plan[t] = self.spot_plan[t - 1].copy()
+            available_spot_to_redistribute = num_spots - self.spot_plan.row_sum(t - 1)
+            self.spot_plan.copy_row(t - 1, t)
 
         while available_spot_to_redistribute > 0:
-            self.spot_plan[t][self.last_zone_idx] += 1
-            self.last_zone_idx = (self.last_zone_idx + 1) % len(config.regions)
+            self.spot_plan.add(t, self.last_zone_idx)
+            self.last_zone_idx = (self.last_zone_idx + 1) % len(self.ctx.regions)
             available_spot_to_redistribute -= 1
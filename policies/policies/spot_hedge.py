@@ -1,87 +1,89 @@
-import random
-from typing import List
+from typing import Dict, Optional
+
+import numpy as np
 
 from policies import spot_policy
-from utils import config
 from policies.spot_policy import SpotPolicyType
 
 
 class SpotHedge(spot_policy.Policy):
     NAME = SpotPolicyType.SpotHedge
 
-    def __init__(self, args) -> None:
-        super().__init__(args)
-        self.active_region_list: List[int] = list(range(len(config.regions)))
-        self.preemptive_region_list: List[int] = []
-        self.last_spot_plan: List[int] = []
+    def __init__(self, args, ctx) -> None:
+        super().__init__(args, ctx)
+        # Insertion-ordered sets of region indices: membership changes are
+        # O(1) and random picks see the regions in the order they joined.
+        self.active_regions: Dict[int, None] = dict.fromkeys(
+            range(len(self.ctx.regions))
+        )
+        self.preemptive_regions: Dict[int, None] = {}
+        self.last_spot_plan: Optional[np.ndarray] = None
         self.available_spots_to_distribute = 0
 
     def _reset(self) -> None:
         super()._reset()
-        self.active_region_list = list(range(len(config.regions)))
-        self.preemptive_region_list = []
-        self.last_spot_plan = []
+        self.active_regions = dict.fromkeys(range(len(self.ctx.regions)))
+        self.preemptive_regions = {}
+        self.last_spot_plan = None
         self.available_spots_to_distribute = 0
 
     def _distribute_available_spot(self, t):
-        def allocate_zone(current_zones):
-            idx = random.choice(current_zones)
-            self.spot_plan[t][idx] += 1
-            self.available_spots_to_distribute -= 1
-            self._distribute_available_spot(t)
+        """Places the spots to distribute on active regions, one at a time.
 
+        Each spot goes to a random active region without spots at `t`, or to
+        any active region once they all have one.
+        """
         if self.available_spots_to_distribute <= 0:
             return
 
-        current_zones = list(self.active_region_list)
-        for region_idx, _ in enumerate(config.regions):
-            if self.spot_plan[t][region_idx] > 0 and region_idx in current_zones:
-                current_zones.remove(region_idx)
-
-        if len(current_zones) > 0:
-            allocate_zone(current_zones)
-            return
+        spot_row = self.spot_plan[t]
+        empty_zones = [idx for idx in self.active_regions if spot_row[idx] == 0]
+        while self.available_spots_to_distribute > 0 and empty_zones:
+            idx = self.ctx.random.choice(empty_zones)
+            empty_zones.remove(idx)
+            self.spot_plan.add(t, idx)
+            self.available_spots_to_distribute -= 1
 
-        current_zones = list(self.active_region_list)
-        allocate_zone(current_zones)
-        return
+        current_zones = list(self.active_regions)
+        while self.available_spots_to_distribute > 0:
+            self.spot_plan.add(t, self.ctx.random.choice(current_zones))
+            self.available_spots_to_distribute -= 1
 
     def _move_region_to_active(self, region_idx):
-        for r in self.preemptive_region_list:
-            if region_idx == r:
-                self.preemptive_region_list.remove(r)
-                self.active_region_list.append(r)
+        if region_idx in self.preemptive_regions:
+            del self.preemptive_regions[region_idx]
+            self.active_regions[region_idx] = None
 
     def _move_region_to_preempt(self, region_idx):
-        for r in self.active_region_list:
-            if region_idx == r:
-                self.active_region_list.remove(r)
-                self.preemptive_region_list.append(r)
+        if region_idx in self.active_regions:
+            del self.active_regions[region_idx]
+            self.preemptive_regions[region_idx] = None
 
     def _maintain_list(self):
-        if len(self.active_region_list) <= min(1, len(config.regions) - 3):
-            self.active_region_list = list(range(len(config.regions)))
-            self.preemptive_region_list = []
+        if len(self.active_regions) <= min(1, len(self.ctx.regions) - 3):
+            self.active_regions = dict.fromkeys(range(len(self.ctx.regions)))
+            self.preemptive_regions = {}
 
     def _get_next_allocation(self, t, i, num_spots):
-        if self.last_spot_plan:
-            for region_idx, _ in enumerate(config.regions):
-                if self.last_spot_plan[region_idx] > self.spot_plan[t - 1][region_idx]:
-                    self._move_region_to_preempt(region_idx)
-
-                elif (
-                    self.last_spot_plan[region_idx] > 0
-                    and self.last_spot_plan[region_idx]
-                    == self.spot_plan[t - 1][region_idx]
-                ):
-                    self._move_region_to_active(region_idx)
-
-        if num_spots >= sum(self.spot_plan[t - 1]):
-            self.available_spots_to_distribute = num_spots - sum(self.spot_plan[t - 1])
-            self.spot_plan[t] = self.spot_plan[t - 1].copy()
+        if self.last_spot_plan is not None:
+            last_row = self.spot_plan[t - 1]
+            # Regions that lost spots since the last allocation, and regions
+            # that kept all of theirs. The two are disjoint, so the order of
+            # the moves does not matter.
+            for region_idx in np.flatnonzero(self.last_spot_plan > last_row):
+                self._move_region_to_preempt(int(region_idx))
+            for region_idx in np.flatnonzero(
+                (self.last_spot_plan > 0) & (self.last_spot_plan == last_row)
+            ):
+                self._move_region_to_active(int(region_idx))
+
+        num_spots_last_tick = self.spot_plan.row_sum(t - 1)
+        if num_spots >= num_spots_last_tick:
+            self.available_spots_to_distribute = num_spots - num_spots_last_tick
+            self.spot_plan.copy_row(t - 1, t)
         else:
             self.available_spots_to_distribute = num_spots
-            self.spot_plan[t] = [0] * len(config.regions)
+            self.spot_plan.clear_row(t)
 
         self._maintain_list()
         self._distribute_available_spot(t)
@@ -1,6 +1,7 @@
-from typing import List, Tuple
+from typing import Tuple
 
-from policies import fallback_policy, spot_policy
+from policies import activity as activity_lib
+from policies import fallback_policy
 from policies.fallback_policy import FallbackType
 
 
@@ -11,15 +12,14 @@ class SpotFailoverNoSafety(fallback_policy.FallbackPolicy):
         self,
         t: int,
         i: int,
-        spot_plan: List[List[int]],
-        demand_plan: List[int],
+        activity: activity_lib.ActivityTracker,
         num_target,
         num_provision,
     ) -> Tuple[int, int]:
         num_demand = 0
         num_spot = num_provision
 
-        num_active_spot = spot_policy.Policy.num_active_spot(t - 1, spot_plan)
+        num_active_spot = activity.num_active_spot(t - 1)
         if num_provision - num_active_spot > 0:
             num_demand = min(num_target, num_provision - num_active_spot)
 
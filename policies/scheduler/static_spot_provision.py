@@ -1,5 +1,6 @@
-from typing import List, Tuple
+from typing import Tuple
 
+from policies import activity as activity_lib
 from policies import fallback_policy
 from policies.fallback_policy import FallbackType
 
@@ -11,8 +12,7 @@ class StaticSpotProvision(fallback_policy.FallbackPolicy):
         self,
         t: int,
         i: int,
-        spot_plan: List[List[int]],
-        demand_plan: List[int],
+        activity: activity_lib.ActivityTracker,
         num_target,
         num_provision,
     ) -> Tuple[int, int]:
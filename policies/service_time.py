@@ -0,0 +1,120 @@
+import enum
+from typing import Dict, Type
+
+import numpy as np
+
+from policies import workload as workload_lib
+
+
+class ServiceTimeModelType(enum.Enum):
+    Exponential = "Exponential"
+    TokenLength = "TokenLength"
+
+
+class OutputLenDistribution(enum.Enum):
+    Exponential = "Exponential"
+    Uniform = "Uniform"
+    Constant = "Constant"
+
+
+class ServiceTimeModel:
+    """Service time of a request on a replica serving it alone.
+
+    Draws from the random engine of the workload passed in, like the nodes of
+    the latency simulator always did, so runs stay reproducible.
+    """
+
+    NAME = "ServiceTimeModel"
+    REGISTRY: Dict[str, Type["ServiceTimeModel"]] = dict()
+
+    def __init__(self, workload: workload_lib.Workload, **kwargs) -> None:
+        del kwargs
+        self.workload = workload
+
+    def __init_subclass__(cls) -> None:
+        if cls.NAME is None:
+            return
+        assert cls.NAME not in cls.REGISTRY, f"Name {cls.NAME} already exists"
+        cls.REGISTRY[cls.NAME] = cls
+
+    @classmethod
+    def from_name(cls, name):
+        name = ServiceTimeModelType(name)
+        assert name in cls.REGISTRY, (name, cls.REGISTRY)
+        return cls.REGISTRY[name]
+
+    def sample(self, prompt_tokens: int) -> float:
+        raise NotImplementedError
+
+    def sample_many(self, prompt_tokens: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    @property
+    def name(self):
+        return f"{self.NAME}"
+
+
+class Exponential(ServiceTimeModel):
+    """Exponential service with the workload's rate, ignoring the prompt."""
+
+    NAME = ServiceTimeModelType.Exponential
+
+    def sample(self, prompt_tokens: int) -> float:
+        return self.workload.np_random.exponential(1 / self.workload.service_rate)
+
+    def sample_many(self, prompt_tokens: np.ndarray) -> np.ndarray:
+        return self.workload.np_random.exponential(
+            1 / self.workload.service_rate, size=len(prompt_tokens)
+        )
+
+
+class TokenLength(ServiceTimeModel):
+    """Prefill time linear in the prompt plus decode time linear in the output.
+
+    The prompt length comes from the request; the output length is drawn
+    from `output_len_distribution` with mean `output_len_mean`, capped at
+    `output_len_max` tokens.
+    """
+
+    NAME = ServiceTimeModelType.TokenLength
+
+    def __init__(
+        self,
+        workload: workload_lib.Workload,
+        prefill_time_per_token: float,
+        decode_time_per_token: float,
+        output_len_distribution: str,
+        output_len_mean: float,
+        output_len_max: int,
+        **kwargs,
+    ) -> None:
+        super().__init__(workload, **kwargs)
+        self.prefill_time_per_token = prefill_time_per_token
+        self.decode_time_per_token = decode_time_per_token
+        self.output_len_distribution = OutputLenDistribution(output_len_distribution)
+        self.output_len_mean = output_len_mean
+        self.output_len_max = output_len_max
+
+    def _output_tokens(self, size=None):
+        np_random = self.workload.np_random
+        if self.output_len_distribution == OutputLenDistribution.Exponential:
+            tokens = np.ceil(np_random.exponential(self.output_len_mean, size=size))
+        elif self.output_len_distribution == OutputLenDistribution.Uniform:
+            tokens = np_random.randint(1, int(2 * self.output_len_mean), size=size)
+        elif size is None:
+            tokens = self.output_len_mean
+        else:
+            tokens = np.full(size, self.output_len_mean)
+        return np.clip(tokens, 1, self.output_len_max)
+
+    def sample(self, prompt_tokens: int) -> float:
+        return float(
+            prompt_tokens * self.prefill_time_per_token
+            + self._output_tokens() * self.decode_time_per_token
+        )
+
+    def sample_many(self, prompt_tokens: np.ndarray) -> np.ndarray:
+        return (
+            np.asarray(prompt_tokens) * self.prefill_time_per_token
+            + self._output_tokens(len(prompt_tokens)) * self.decode_time_per_token
+        )
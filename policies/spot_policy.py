@@ -1,8 +1,17 @@
-import random
+import collections
 from typing import Dict, List, Tuple, Type
 
-from policies import autoscaler, fallback_policy, latency_simulator, workload
-from utils import config, utils
+import numpy as np
+
+from policies import (
+    activity,
+    autoscaler,
+    fallback_policy,
+    latency_simulator,
+    plan,
+    workload,
+)
+from utils import context, utils
 import enum
 
 
@@ -17,8 +26,9 @@ class SpotPolicyType(enum.Enum):
 class Policy:
     REGISTRY: Dict[str, Type["Policy"]] = dict()
 
-    def __init__(self, args) -> None:
-        self._num_repeat = config.num_repeats
+    def __init__(self, args, ctx: context.SimulationContext) -> None:
+        self.ctx = ctx
+        self._num_repeat = ctx.num_repeats
         self._results: List[
             Dict[
                 str,
@@ -29,19 +39,29 @@ class Policy:
                 ],
             ]
         ] = []
-
-        self.spot_plan = [
-            [0] * len(config.regions) for _ in range(config.total_time_period)
-        ]
-        self.demand_plan = [0 for _ in range(config.total_time_period)]
+        # Node-count timeline of every result, simulated once all repeats
+        # are planned.
+        self._node_over_time: List[List[int]] = []
+
+        self.spot_plan = plan.SpotPlan(ctx.total_time_period, len(ctx.regions))
+        self.demand_plan = plan.DemandPlan(ctx.total_time_period)
+        self.activity = activity.ActivityTracker(
+            ctx.total_time_period,
+            len(ctx.regions),
+            ctx.cold_start_delay,
+            ctx.num_min,
+        )
+        self.available_spots = np.zeros(
+            (ctx.total_time_period, len(ctx.regions)), dtype=np.int64
+        )
         self.overprovision_num = args.overprovision_num
 
         self.fallback_policy = fallback_policy.FallbackPolicy.from_name(
             args.fallback_policy
-        )()
+        )(ctx)
         self.workload = workload.Workload.from_name(args.workload)(use_simulator=True)
         self.autoscaler = autoscaler.Autoscaler.from_name(args.autoscaler)(
-            self.workload
+            self.workload, ctx
         )
 
     def __init_subclass__(cls) -> None:
@@ -56,38 +76,32 @@ class Policy:
         return cls.REGISTRY[name]
 
     def _reset(self) -> None:
-        self.spot_plan = [
-            [0] * len(config.regions) for _ in range(config.total_time_period)
-        ]
-        self.demand_plan = [0 for _ in range(config.total_time_period)]
+        self.spot_plan.reset()
+        self.demand_plan.reset()
+        self.activity.reset()
         self.fallback_policy.reset()
 
     def run_exp(self):
-        for i in range(config.num_repeats):
-            random.shuffle(config.regions)
+        for i in range(self.ctx.num_repeats):
+            self.ctx.random.shuffle(self.ctx.regions)
+            self.available_spots = utils.available_spot_matrix(self.ctx, i)
             self._run_exp_one(i)
             self._reset()
+        self._add_latency_results()
         return self._results
 
     def _current_satisfied_time(self, t: int):
-        avail_meet_time = 0
-        for i in range(t):
-            active_num_spots = Policy.num_active_spot(i, self.spot_plan)
-            active_num_demand = Policy.num_active_demand(i, self.demand_plan)
-            total_active_nodes = active_num_demand + active_num_spots
-
-            if total_active_nodes >= config.num_min:
-                avail_meet_time += 1
-        return avail_meet_time
+        return self.activity.num_available_ticks(t)
 
     def _run_exp_one(self, i: int):
-        for t in range(config.total_time_period):
-            num_target = self.autoscaler.get_target_num_replicas(t + i)
+        targets = self.autoscaler.get_target_timeline(i).tolist()
+        for t in range(self.ctx.total_time_period):
+            num_target = targets[t]
             num_provision = num_target + self.overprovision_num
 
             # spot_policy
             num_demand, num_spot = self.fallback_policy.generate_mix_plan(
-                t, i, self.spot_plan, self.demand_plan, num_target, num_provision
+                t, i, self.activity, num_target, num_provision
             )
             assert (
                 self.NAME == SpotPolicyType.OnDemand
@@ -110,6 +124,7 @@ class Policy:
             self._get_next_allocation(t, i, num_spot)
             self._step_spot(t, i)
             self._step_demand(t, num_demand)
+            self.activity.record(t, self.spot_plan[t], self.demand_plan[t])
 
         self._record_exp_result(i)
 
@@ -117,89 +132,61 @@ class Policy:
         raise NotImplementedError
 
     def _step_spot(self, t, i):
-        for region_idx, _ in enumerate(config.regions):
-            max_num_spot_available = utils.num_available_spot(region_idx, t, i)
-            if self.spot_plan[t][region_idx] > max_num_spot_available:
-                self.spot_plan[t][region_idx] = max_num_spot_available
-
-    @classmethod
-    def num_active_spot(cls, t, spot_plan):
-        active_num_spots = 0
-        if t < config.cold_start_delay:
-            pass
-        else:
-            for region_idx, _ in enumerate(config.regions):
-                num_spot_history = []
-                for t_past in range(t - config.cold_start_delay, t + 1):
-                    num_spot_history.append(spot_plan[t_past][region_idx])
-                active_num_spots += min(num_spot_history) if num_spot_history else 0
-        return active_num_spots
-
-    @classmethod
-    def num_active_demand(cls, t, demand_plan):
-        if t < config.cold_start_delay:
-            active_num_demand = 0
-        else:
-            num_demand_history = []
-            for t_past in range(t - config.cold_start_delay, t + 1):
-                num_demand_history.append(demand_plan[t_past])
-            active_num_demand = min(num_demand_history) if num_demand_history else 0
-        return active_num_demand
+        self.spot_plan.clamp_row(t, self.available_spots[t])
 
     def _step_demand(self, t, num_demand):
-        self.demand_plan[t] = num_demand
+        self.demand_plan.set(t, num_demand)
 
     def _record_exp_result(self, i):
         availability, cumulative_cost, node_hist, node_over_time = self.score_plan()
-        p50, p90, p99, p999, latency_list = latency_simulator.simulate_latency(
-            node_over_time, self.workload, i
-        )
         new_result = {
             "repeat_idx": i,
             "availability": availability,
             "cost": cumulative_cost,
             "node_hist": node_hist,
-            "p50": p50,
-            "p90": p90,
-            "p99": p99,
-            "p999": p999,
-            "latency_list": latency_list,
         }
-        self._results.append(new_result)
+        self._add_result(new_result, node_over_time)
         print(round(availability, 3), round(cumulative_cost, 3), node_hist)
 
-    def score_plan(self):
-        cumulative_cost = 0
-        avail_meet_time = 0
-        total_num_spots = 0
-        total_num_demand = 0
-        nodes_to_count = {}
-        node_over_time = []
-
-        for t in range(config.cold_start_delay, config.total_time_period):
-            total_num_spots += sum(
-                [
-                    self.spot_plan[t][region_idx]
-                    for region_idx in range(len(config.regions))
-                ]
-            )
-            total_num_demand += self.demand_plan[t]
-
-            active_num_spots = Policy.num_active_spot(t, self.spot_plan)
-            active_num_demand = Policy.num_active_demand(t, self.demand_plan)
-            if active_num_demand + active_num_spots >= config.num_min:
-                avail_meet_time += 1
-                if t < config.cold_start_delay:
-                    assert False, (active_num_demand, active_num_spots)
-
-            total_active_nodes = active_num_demand + active_num_spots
-            nodes_to_count[total_active_nodes] = (
-                nodes_to_count.get(total_active_nodes, 0) + 1
-            )
-            node_over_time.append(total_active_nodes)
+    def _add_result(self, new_result, node_over_time) -> None:
+        self._results.append(new_result)
+        self._node_over_time.append(node_over_time)
 
-        avail = avail_meet_time / (config.total_time_period - config.cold_start_delay)
-        cumulative_cost = total_num_spots + total_num_demand * config.cost_demand
+    def _add_latency_results(self) -> None:
+        latencies = latency_simulator.simulate_latencies(
+            self._node_over_time, self.workload, self.ctx
+        )
+        log_dirs = latency_simulator.request_log_dirs(
+            self._node_over_time, self.workload, self.ctx
+        )
+        for result, (p50, p90, p99, p999, latency_sketch), log_dir in zip(
+            self._results, latencies, log_dirs
+        ):
+            result["p50"] = p50
+            result["p90"] = p90
+            result["p99"] = p99
+            result["p999"] = p999
+            result["latency_sketch"] = latency_sketch.to_dict()
+            if log_dir is not None:
+                result["request_log"] = log_dir
+
+    def score_plan(self):
+        cold_start_delay = self.ctx.cold_start_delay
+        spot_plan = self.spot_plan.as_array()
+        demand_plan = self.demand_plan.as_array()
+        total_num_spots = int(spot_plan[cold_start_delay:].sum())
+        total_num_demand = int(demand_plan[cold_start_delay:].sum())
+
+        active_spot = activity.active_counts(spot_plan, cold_start_delay)
+        active_demand = activity.active_counts(demand_plan, cold_start_delay)
+        active_nodes = active_spot.sum(axis=1)[cold_start_delay:]
+        active_nodes += active_demand[cold_start_delay:]
+        avail_meet_time = int(np.count_nonzero(active_nodes >= self.ctx.num_min))
+        node_over_time = active_nodes.tolist()
+        nodes_to_count = dict(collections.Counter(node_over_time))
+
+        avail = avail_meet_time / (self.ctx.total_time_period - cold_start_delay)
+        cumulative_cost = total_num_spots + total_num_demand * self.ctx.cost_demand
         print(
             f"Name: {self.name}, total_num_spots: {total_num_spots}, total_num_demand: {total_num_demand}, avail_meet_time: {avail_meet_time}"
         )
@@ -1,8 +1,18 @@
-from typing import Dict, List, Type
+from typing import Any, Callable, Dict, List, Tuple, Type
 import enum
 import random
 import numpy as np
 
+# Workload data loaded by this process, keyed by workload type and parameters.
+# Entries are never modified, so every instance can share them.
+_WORKLOAD_STORE: Dict[Tuple, Any] = {}
+
+
+def read_only(array) -> np.ndarray:
+    array = np.asarray(array)
+    array.flags.writeable = False
+    return array
+
 
 class WorkloadType(enum.Enum):
     Poisson = "Poisson"
@@ -12,20 +22,45 @@ class WorkloadType(enum.Enum):
 
 class Workload:
     REGISTRY: Dict[str, Type["Workload"]] = dict()
+    # Part of the latency cache key. Subclasses bump it whenever the requests
+    # they generate for the same parameters change, e.g. a new random
+    # generator or trace parser, so results simulated on the old requests are
+    # not served from the cache.
+    DATA_VERSION = 1
 
     def __init__(self, use_simulator=False, seed=0) -> None:
         self.request_arrival_times: List[int] = []
         self.request_interarrival_times: List[int] = []
+        # Per-instance random engines, so workloads of concurrent experiments
+        # do not share the global random state.
+        self.seed = seed
+        # Key of the shared data this workload loaded, if any.
+        self.data_key = None
+        self.random = random.Random()
+        self.np_random = np.random.RandomState()
+        self.reload_seed()
         self.load_workload()
+        # Arrival times are cumulative, hence sorted; kept as an array so
+        # window counts are two binary searches.
+        self.request_arrival_times = np.asarray(
+            self.request_arrival_times, dtype=np.float64
+        )
         self.service_time = 10  # To match e2e. 
         self.service_rate = 1 / self.service_time  # To match e2e.
         self.TIMEOUT = 100
-        self.seed = seed
         self.reload_seed()
 
+    def load_shared(self, key: Tuple, build: Callable[[], Any]):
+        """Returns the data built for `key`, building it once per process."""
+        key = (self.NAME,) + key
+        self.data_key = key
+        if key not in _WORKLOAD_STORE:
+            _WORKLOAD_STORE[key] = build()
+        return _WORKLOAD_STORE[key]
+
     def reload_seed(self):
-        random.seed(self.seed)
-        np.random.seed(self.seed)
+        self.random.seed(self.seed)
+        self.np_random.seed(self.seed)
 
     def __init_subclass__(cls) -> None:
         if cls.NAME is None:
@@ -38,27 +73,43 @@ class Workload:
         assert name in cls.REGISTRY, (name, cls.REGISTRY)
         return cls.REGISTRY[name]
 
+    def ensure_arrivals_until(self, time):
+        """Makes `request_arrival_times` cover `time` for lazy workloads."""
+        del time
+
     def get_window_num_requests(self, start_time, end_time):
+        self.ensure_arrivals_until(end_time)
         assert start_time <= self.request_arrival_times[-1], (
             "start_time: %s, end_time: %s, last_arrival_time: %s"
             % (start_time, end_time, self.request_arrival_times[-1])
         )
+        return int(self.get_window_num_requests_many(start_time, end_time))
 
-        num_requests = 0
-        for i in range(len(self.request_arrival_times)):
-            if (
-                self.request_arrival_times[i] >= start_time
-                and self.request_arrival_times[i] <= end_time
-            ):
-                num_requests += 1
-
-            if self.request_arrival_times[i] > end_time:
-                break
-        return num_requests
+    def get_window_num_requests_many(self, start_times, end_times):
+        """Number of arrivals in each closed window [start_time, end_time]."""
+        self.ensure_arrivals_until(np.max(end_times))
+        arrivals = self.request_arrival_times
+        return np.searchsorted(arrivals, end_times, side="right") - np.searchsorted(
+            arrivals, start_times, side="left"
+        )
 
     def get_next_interarrival_time(self, i):
         i = i % len(self.request_interarrival_times)
-        return self.request_interarrival_times[i]
+        return float(self.request_interarrival_times[i])
+
+    def get_prompt_tokens(self, i):
+        """Prompt length of the request returned by the last interarrival call.
+
+        Workloads without request contents have no prompt.
+        """
+        del i
+        return 0
+
+    @property
+    def data_identity(self) -> List:
+        """Version and parameters of the generated requests, for cache keys."""
+        params = self.data_key[1:] if self.data_key is not None else ()
+        return [self.DATA_VERSION, *params]
 
     @property
     def name(self):
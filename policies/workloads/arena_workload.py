@@ -1,15 +1,19 @@
+import numpy as np
+
 from policies import workload
 from policies.workload import WorkloadType
 from workloads.arena import loader
-import random
 
 
 class ArenaWorkload(workload.Workload):
     NAME = WorkloadType.Arena
+    DATA_VERSION = 1
 
     def __init__(self, use_simulator=False, seed=0, arena_trace_scale=None):
         self.intervals = None
         self.conversations = None
+        self.prompt_tokens = None
+        self.last_idx = None
         self.start_idx = None
         self.current_idx = 0
         print('arg', use_simulator, seed, arena_trace_scale)
@@ -28,43 +32,76 @@ class ArenaWorkload(workload.Workload):
         self.start_idx = None
         self.current_idx = 0
 
-    def load_workload(self):
-        self.intervals, self.conversations = loader.load_arena_dataset(
-            self.arena_trace_scale
+    def _load_dataset(self):
+        intervals, conversations = loader.load_arena_dataset(self.arena_trace_scale)
+        print("Arena", "load_workload", intervals[:10])
+        return (
+            workload.read_only(intervals),
+            conversations,
+            workload.read_only(loader.load_arena_prompt_tokens()),
+            workload.read_only(np.cumsum(intervals)),
         )
-        print("Arena", "load_workload", self.intervals[:10])
-        t_prev = 0
-        for interval in self.intervals:
-            t_prev = interval + t_prev
-            self.request_arrival_times.append(t_prev)
-            self.request_interarrival_times.append(interval)
 
-    def get_next_interval_and_conversation(self):
+    def load_workload(self):
+        (
+            self.intervals,
+            self.conversations,
+            self.prompt_tokens,
+            self.request_arrival_times,
+        ) = self.load_shared((self.arena_trace_scale,), self._load_dataset)
+        self.request_interarrival_times = self.intervals
+
+    def _ensure_start_idx(self):
         # Matches the e2e file.
         if self.start_idx is None:
-            self.start_idx = random.randint(0, len(self.intervals) - 1)
+            self.start_idx = self.random.randint(0, len(self.intervals) - 1)
 
+    def _next_idx(self):
+        self._ensure_start_idx()
         idx = (self.start_idx + self.current_idx) % len(self.intervals)
         self.current_idx += 1
+        self.last_idx = idx
+        return idx
+
+    def get_next_interval_and_conversation(self):
+        idx = self._next_idx()
         return self.intervals[idx], self.conversations[idx]
 
     def get_next_interarrival_time(self, i):
         del i
-        interval, _ = self.get_next_interval_and_conversation()
-        return interval
+        return float(self.intervals[self._next_idx()])
+
+    def get_prompt_tokens(self, i):
+        del i
+        return int(self.prompt_tokens[self.last_idx])
+
+    def get_next_intervals(self, num: int) -> np.ndarray:
+        """The next `num` intervals at once, wrapping around the trace."""
+        self._ensure_start_idx()
+        first = self.start_idx + self.current_idx
+        idxs = np.arange(first, first + num) % len(self.intervals)
+        self.current_idx += num
+        if num:
+            self.last_idx = int(idxs[-1])
+        return self.intervals[idxs]
 
     def calculate_max_request_num(self, run_time: float) -> int:
-        tot = 0.0
-        if self.start_idx is None:
-            self.start_idx = random.randint(0, len(self.intervals) - 1)
+        """Number of requests from the start index that arrive by `run_time`.
+
+        Counts, on the trace repeated end to end, the cumulative intervals
+        past the start index that do not exceed `run_time`, using the
+        cumulative sums in `request_arrival_times`.
+        """
+        self._ensure_start_idx()
         self.reload_seed()
-        i = 0
-        while True:
-            idx = (self.start_idx + i) % len(self.intervals)
-            tot += self.intervals[idx]
-            if tot > run_time:
-                return i
-            i += 1
+        cumsum = self.request_arrival_times
+        before_start = cumsum[self.start_idx - 1] if self.start_idx else 0.0
+        num_cycles, rest = divmod(run_time + before_start, cumsum[-1])
+        return (
+            int(num_cycles) * len(cumsum)
+            + int(np.searchsorted(cumsum, rest, side="right"))
+            - self.start_idx
+        )
 
     @property
     def trace_scale(self):
@@ -1,18 +1,22 @@
 import math
+
+import numpy as np
+
 from policies import workload
 from policies.workload import WorkloadType
 
 
 class MAFWorkload(workload.Workload):
     NAME = WorkloadType.MAF
+    DATA_VERSION = 1
 
     def __init__(self, use_simulator=False, seed=0):
         self.workload_addr = "workloads/maf1/cleaned.csv"
         self.scale_factor = 10000
-        super().__init__(seed)
+        super().__init__(use_simulator, seed)
 
-    def load_workload(self):
-        t_prev = 0
+    def _parse_workload(self):
+        interarrival_times = []
         with open(self.workload_addr, "r") as f:
             skip_first_line = True
             for line in f:
@@ -26,9 +30,19 @@ class MAFWorkload(workload.Workload):
                 # Cap max at 2 requests per seconds.
                 num_requests = min(num_requests, 60 * 1.5)
                 request_per_sec = num_requests / 60
-                inter_arrival_times = [1 / request_per_sec] * math.ceil(request_per_sec)
+                interarrival_times.extend(
+                    [1 / request_per_sec] * math.ceil(request_per_sec)
+                )
+        interarrival_times = np.asarray(interarrival_times, dtype=np.float64)
+        return (
+            workload.read_only(interarrival_times),
+            workload.read_only(np.cumsum(interarrival_times)),
+        )
 
-                for inter_arrival_time in inter_arrival_times:
-                    t_prev += inter_arrival_time
-                    self.request_arrival_times.append(t_prev)
-                    self.request_interarrival_times.append(inter_arrival_time)
+    def load_workload(self):
+        (
+            self.request_interarrival_times,
+            self.request_arrival_times,
+        ) = self.load_shared(
+            (self.workload_addr, self.scale_factor), self._parse_workload
+        )
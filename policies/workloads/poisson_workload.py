@@ -4,18 +4,85 @@ from policies import workload
 from policies.workload import WorkloadType
 
 
+class _PoissonArrivals:
+    """Poisson arrivals of one seed, generated in vectorized chunks on demand.
+
+    Chunk `k` is drawn from its own `np.random.Generator` stream spawned from
+    the seed, so the arrivals do not depend on how far or in which order they
+    were consumed. The arrays are allocated for `num_requests` up front, but
+    only the pages of generated chunks are ever touched. Generated values are
+    never changed, so every workload instance of the seed shares them.
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, request_rate, num_requests, seed) -> None:
+        self.request_rate = request_rate
+        self.num_requests = num_requests
+        self.interarrivals = np.empty(num_requests, dtype=np.float64)
+        self.arrivals = np.empty(num_requests, dtype=np.float64)
+        self.num_generated = 0
+        self._seed_sequence = np.random.SeedSequence(seed)
+        self.generate_chunk()
+
+    def generate_chunk(self):
+        start = self.num_generated
+        end = min(start + self.CHUNK_SIZE, self.num_requests)
+        chunk_idx = start // self.CHUNK_SIZE
+        generator = np.random.Generator(
+            np.random.PCG64(
+                np.random.SeedSequence(
+                    self._seed_sequence.entropy, spawn_key=(chunk_idx,)
+                )
+            )
+        )
+        interarrivals = generator.exponential(1 / self.request_rate, size=end - start)
+        offset = self.arrivals[start - 1] if start > 0 else 0.0
+        self.interarrivals[start:end] = interarrivals
+        self.arrivals[start:end] = offset + np.cumsum(interarrivals)
+        self.num_generated = end
+
+    def ensure_until(self, time):
+        while (
+            self.num_generated < self.num_requests
+            and self.arrivals[self.num_generated - 1] < time
+        ):
+            self.generate_chunk()
+
+
 class PoissonWorkload(workload.Workload):
     NAME = WorkloadType.Poisson
+    # 2: arrivals drawn in chunks from per-chunk PCG64 streams.
+    DATA_VERSION = 2
 
     def __init__(self, use_simulator=False, seed=0):
         self.request_rate = 0.05
         self.num_requests = 8000000
-        super().__init__(seed)
+        super().__init__(use_simulator, seed)
 
     def load_workload(self):
-        t_prev = 0
-        for _ in range(self.num_requests):
-            inter_arrival_time = np.random.exponential(1 / self.request_rate)
-            t_prev = inter_arrival_time + t_prev
-            self.request_arrival_times.append(t_prev)
-            self.request_interarrival_times.append(inter_arrival_time)
+        self._stream = self.load_shared(
+            (self.request_rate, self.num_requests, self.seed),
+            lambda: _PoissonArrivals(self.request_rate, self.num_requests, self.seed),
+        )
+        self._refresh_views()
+
+    def _refresh_views(self):
+        # Read-only views of what the shared stream has generated so far.
+        num_generated = self._stream.num_generated
+        self.request_interarrival_times = workload.read_only(
+            self._stream.interarrivals[:num_generated]
+        )
+        self.request_arrival_times = workload.read_only(
+            self._stream.arrivals[:num_generated]
+        )
+
+    def ensure_arrivals_until(self, time):
+        self._stream.ensure_until(time)
+        self._refresh_views()
+
+    def get_next_interarrival_time(self, i):
+        i = i % self.num_requests
+        while i >= self._stream.num_generated:
+            self._stream.generate_chunk()
+        return float(self._stream.interarrivals[i])
@@ -1,18 +1,39 @@
-regions = []
+# Defaults for a SimulationContext (see utils/context.py). Per-experiment state
+# such as regions, traces and random offsets lives on the context instead.
 target_num_instances = 3
-trace_for_each_region = dict()
 total_time_period = 1000
 slo = 0.99
 cold_start_delay = 0
 num_repeats = 3
-results = {}
-random_offsets = []
-gap_seconds = 300
-min_trace_len = 1000000
-spot_policy = ""
-autoscaler = ""
 time_tick_in_seconds = 30
-trace_addr = ""
 overprovision_num = 3
 num_min = 3
 cost_demand = 3
+latency_engine = "SimPy"
+load_balancer = "RoundRobin"
+# Retry queued requests of removed replicas instead of timing them out.
+redistribute_requests = False
+replica_model = "SingleServer"
+# Continuous batching as in e2e/spot_hedge.yaml (vLLM --max-num-seqs 64). A
+# decoding step takes batch_step_time seconds for one request and
+# batch_step_slowdown times longer for every additional one.
+max_batch_size = 64
+batch_step_time = 0.05
+batch_step_slowdown = 0.02
+# The TokenLength service time model charges prefill per prompt token and
+# decoding per output token; by default a request averages the 10 s service
+# time used elsewhere.
+service_time_model = "Exponential"
+prefill_time_per_token = 0.0005
+decode_time_per_token = 0.04
+output_len_distribution = "Exponential"
+output_len_mean = 250
+output_len_max = 2048
+# Directory to export every simulated request to (see utils/request_log.py).
+request_log_dir = None
+# Set latency_cache_dir to None to keep simulated latencies in memory only.
+latency_cache_dir = "latency_cache"
+latency_cache_max_entries = 256
+latency_cache_max_bytes = 256 * 1024 * 1024
+# Processes simulating the latency of an experiment's repeats; None for all CPUs.
+latency_workers = None
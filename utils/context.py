@@ -0,0 +1,85 @@
+import random
+from typing import Dict, List
+
+import numpy as np
+
+from utils import config, data_loader
+
+
+class SimulationContext:
+    """Settings and state of one experiment.
+
+    Created by `init.init` and passed to the policy, fallback policy,
+    autoscaler and latency simulator instead of module globals, so several
+    experiments can run in one interpreter. Loaded traces are shared between
+    contexts; the region order, random offsets and random engine are not.
+    """
+
+    def __init__(
+        self,
+        traces: data_loader.TraceSet,
+        target_num_instances: int = config.target_num_instances,
+        num_repeats: int = config.num_repeats,
+        cold_start_delay: int = config.cold_start_delay,
+        total_time_period: int = config.total_time_period,
+        slo: float = config.slo,
+        cost_demand: int = config.cost_demand,
+        spot_policy=None,
+        autoscaler=None,
+        latency_engine=config.latency_engine,
+        load_balancer=config.load_balancer,
+        redistribute_requests: bool = config.redistribute_requests,
+        replica_model=config.replica_model,
+        max_batch_size: int = config.max_batch_size,
+        service_time_model=config.service_time_model,
+        request_log_dir=config.request_log_dir,
+        seed: int = 0,
+    ) -> None:
+        self.target_num_instances = target_num_instances
+        self.num_repeats = num_repeats
+        self.cold_start_delay = cold_start_delay
+        self.slo = slo
+        self.cost_demand = cost_demand
+        self.num_min = config.num_min
+        self.time_tick_in_seconds = config.time_tick_in_seconds
+        self.spot_policy = spot_policy
+        self.autoscaler = autoscaler
+        # A latency_simulator.LatencyEngineType or its value.
+        self.latency_engine = latency_engine
+        # A load_balancer.LoadBalancerType or its value.
+        self.load_balancer = load_balancer
+        self.redistribute_requests = redistribute_requests
+        # A latency_simulator.ReplicaModelType or its value.
+        self.replica_model = replica_model
+        self.max_batch_size = max_batch_size
+        self.batch_step_time = config.batch_step_time
+        self.batch_step_slowdown = config.batch_step_slowdown
+        # A service_time.ServiceTimeModelType or its value.
+        self.service_time_model = service_time_model
+        self.prefill_time_per_token = config.prefill_time_per_token
+        self.decode_time_per_token = config.decode_time_per_token
+        self.output_len_distribution = config.output_len_distribution
+        self.output_len_mean = config.output_len_mean
+        self.output_len_max = config.output_len_max
+        self.request_log_dir = request_log_dir
+        self.latency_cache_dir = config.latency_cache_dir
+        self.latency_workers = config.latency_workers
+
+        self.trace_addr = traces.trace_dir
+        self.gap_seconds = traces.gap_seconds
+        self.min_trace_len = traces.min_trace_len
+        self.trace_for_each_region: Dict[str, data_loader.SpotTrace] = traces.traces
+        # Shuffled in place by every repeat, so each context owns its copy.
+        self.regions: List[str] = list(traces.regions)
+        self.total_time_period = (
+            int(min(10000, self.min_trace_len / 5))
+            if total_time_period == -1
+            else total_time_period
+        )
+
+        self.random = random.Random(seed)
+        np_random = np.random.RandomState(seed)
+        self.random_offsets = [
+            np_random.randint(0, self.min_trace_len - self.total_time_period)
+            for _ in range(self.num_repeats)
+        ]
@@ -1,49 +1,176 @@
 import json
+import mmap
 import os
+import struct
+from typing import Dict, List
 
-from utils import config
+import numpy as np
+
+from utils import config, files
 
 LARGE_VALUE = 1000000000
 
+_TRACE_CACHE_FILE = "trace_cache.bin"
+_TRACE_CACHE_MAGIC = b"SPOTTRC1"
+_MAX_TRACE_LEN = 1000000
+
+# Trace directories loaded by this process, keyed by directory name.
+_TRACE_SETS: Dict[str, "TraceSet"] = {}
+
+
+class SpotTrace:
+    """Spot availability of one region, kept at the trace's native resolution.
+
+    Samples are `gap_seconds` apart; ticks are mapped onto samples on access
+    instead of repeating every sample `gap_seconds / time_tick_in_seconds`
+    times up front.
+    """
+
+    def __init__(self, samples, ticks_per_sample: int) -> None:
+        self.samples = np.asarray(samples)
+        self.ticks_per_sample = ticks_per_sample
+
+    def __len__(self) -> int:
+        """Length of the trace in ticks."""
+        return len(self.samples) * self.ticks_per_sample
 
-def load_data(path, region):
-    # print(path, region)
+    def at(self, ticks):
+        """Availability at the given tick(s), wrapping around the trace."""
+        return self.samples[(np.asarray(ticks) % len(self)) // self.ticks_per_sample]
+
+    def to_ticks(self) -> np.ndarray:
+        """Materializes the trace at tick resolution."""
+        return np.repeat(self.samples, self.ticks_per_sample)
+
+
+def _parse_trace(path):
+    """Returns the samples and gap_seconds of one JSON trace file."""
     with open(path, "r") as f:
         data_json = json.load(f)
     data = data_json["data"]
-    config.gap_seconds = data_json["metadata"]["gap_seconds"]
+    gap_seconds = data_json["metadata"]["gap_seconds"]
     if "1-node" in path:
         assert False, "1-node is not used"
     elif "2-month" in path:
-        config.trace_for_each_region[region] = [
-            LARGE_VALUE if d == 1 else 0 for d in data
-        ]
-    elif "4" in path:
-        config.trace_for_each_region[region] = data
-    elif "16" in path:
-        config.trace_for_each_region[region] = data
-    elif "a100" in path:
-        config.trace_for_each_region[region] = data
-    else:
+        data = [LARGE_VALUE if d == 1 else 0 for d in data]
+    elif "4" not in path and "16" not in path and "a100" not in path:
         raise NotImplementedError
+    return data, gap_seconds
+
+
+def _source_stats(dir_path, file_names):
+    stats = {}
+    for file_name in file_names:
+        stat = os.stat(os.path.join(dir_path, file_name))
+        stats[file_name] = [stat.st_mtime_ns, stat.st_size]
+    return stats
+
+
+def _write_trace_cache(cache_path, dir_path, file_names):
+    """Converts the JSON traces of a directory into one binary cache file.
 
-    expanded_trace = []
-    for avail in config.trace_for_each_region[region]:
-        expanded_trace.extend(
-            [avail] * int(config.gap_seconds / config.time_tick_in_seconds)
+    Layout: magic, little-endian uint32 header length, JSON header, then one
+    int32 array per region starting at an 8-byte aligned offset. The header
+    records the mtime and size of every source file for invalidation.
+    """
+    header = {"sources": _source_stats(dir_path, file_names), "regions": []}
+    arrays = []
+    offset = 0
+    for file_name in file_names:
+        data, gap_seconds = _parse_trace(os.path.join(dir_path, file_name))
+        samples = np.asarray(data, dtype=np.int32)
+        header["regions"].append(
+            {
+                "name": file_name,
+                "gap_seconds": gap_seconds,
+                "offset": offset,
+                "length": len(samples),
+            }
         )
+        arrays.append(samples)
+        offset += samples.nbytes
 
-    config.trace_for_each_region[region] = expanded_trace
-    config.min_trace_len = min(config.min_trace_len, len(expanded_trace))
+    header_bytes = json.dumps(header).encode()
+    prefix_len = len(_TRACE_CACHE_MAGIC) + 4 + len(header_bytes)
+    padding = b"\0" * (-prefix_len % 8)
 
+    def write(f):
+        f.write(_TRACE_CACHE_MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(padding)
+        for samples in arrays:
+            f.write(samples.tobytes())
 
-def load_trace_from_dir(trace_dir: str):
+    files.atomic_write(cache_path, write)
+
+
+def _open_trace_cache(cache_path, dir_path, file_names):
+    """Memory-maps a trace cache, or returns None if it is missing or stale."""
+    if not os.path.exists(cache_path):
+        return None
+    with open(cache_path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic_len = len(_TRACE_CACHE_MAGIC)
+    if buffer[:magic_len] != _TRACE_CACHE_MAGIC:
+        return None
+    (header_len,) = struct.unpack("<I", buffer[magic_len : magic_len + 4])
+    header = json.loads(buffer[magic_len + 4 : magic_len + 4 + header_len])
+    if header["sources"] != _source_stats(dir_path, file_names):
+        return None
+
+    prefix_len = magic_len + 4 + header_len
+    data_start = prefix_len + (-prefix_len % 8)
+    traces = {}
+    for region in header["regions"]:
+        samples = np.frombuffer(
+            buffer,
+            dtype=np.int32,
+            count=region["length"],
+            offset=data_start + region["offset"],
+        )
+        traces[region["name"]] = (samples, region["gap_seconds"])
+    return traces
+
+
+class TraceSet:
+    """Read-only spot traces of every region in one trace directory."""
+
+    def __init__(self, trace_dir: str, regions: List[str], traces, gap_seconds):
+        self.trace_dir = trace_dir
+        self.regions = regions
+        self.traces: Dict[str, SpotTrace] = traces
+        self.gap_seconds = gap_seconds
+        self.min_trace_len = min(
+            [_MAX_TRACE_LEN] + [len(trace) for trace in traces.values()]
+        )
+
+
+def load_trace_from_dir(trace_dir: str) -> TraceSet:
+    """Loads a trace directory, sharing it with every later caller."""
+    if trace_dir in _TRACE_SETS:
+        return _TRACE_SETS[trace_dir]
+
+    dir_path = "data/" + trace_dir
     regions = []
-    for root, dirs, files in os.walk("data/" + trace_dir):
+    for _, dirs, files in os.walk(dir_path):
         for file_name in files:
             if file_name.endswith(".json"):
-                full_path = os.path.join(root, file_name)
-                load_data(full_path, file_name)
                 regions.append(file_name)
         dirs.clear()  # do not walk sub directories
-    config.regions = regions
+
+    cache_path = os.path.join(dir_path, _TRACE_CACHE_FILE)
+    cached = _open_trace_cache(cache_path, dir_path, regions) if regions else {}
+    if cached is None:
+        _write_trace_cache(cache_path, dir_path, regions)
+        cached = _open_trace_cache(cache_path, dir_path, regions)
+
+    traces = {}
+    gap_seconds = None
+    for region in regions:
+        samples, gap_seconds = cached[region]
+        traces[region] = SpotTrace(
+            samples, int(gap_seconds / config.time_tick_in_seconds)
+        )
+    _TRACE_SETS[trace_dir] = TraceSet(trace_dir, regions, traces, gap_seconds)
+    return _TRACE_SETS[trace_dir]
@@ -0,0 +1,15 @@
+import os
+from typing import Callable, IO
+
+
+def atomic_write(path: str, write: Callable[[IO], None], mode: str = "wb") -> None:
+    """Writes a file through `write(f)` so readers never see it half written.
+
+    The content goes to a temporary file of this process, which is then
+    renamed over `path`. Concurrent jobs may build the same cache file; the
+    rename keeps it consistent, as the last complete copy wins.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, mode) as f:
+        write(f)
+    os.replace(tmp_path, path)
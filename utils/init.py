@@ -1,8 +1,4 @@
-import random
-
-import numpy as np
-
-from utils import config, data_loader, utils, workload_loader
+from utils import config, context, data_loader, workload_loader
 
 
 def init(
@@ -17,24 +13,33 @@ def init(
     trace_addr: str,
     workload_dir: str,
     seed: int,
-):
-    random.seed(seed)
-    np.random.seed(seed)
-
-    config.target_num_instances = target_num_instances
-    config.cold_start_delay = cold_start_delay
-    config.cost_demand = cost_demand
-    config.spot_policy = spot_policy
-    config.autoscaler = autoscaler
-    config.trace_addr = trace_addr
-    data_loader.load_trace_from_dir(trace_addr)
+    latency_engine=config.latency_engine,
+    load_balancer=config.load_balancer,
+    redistribute_requests: bool = config.redistribute_requests,
+    replica_model=config.replica_model,
+    max_batch_size: int = config.max_batch_size,
+    service_time_model=config.service_time_model,
+    request_log_dir=config.request_log_dir,
+) -> context.SimulationContext:
+    traces = data_loader.load_trace_from_dir(trace_addr)
     workload_loader.load_workload_from_dir(workload_dir)
 
-    config.total_time_period = (
-        int(min(10000, config.min_trace_len / 5))
-        if total_time_period == -1
-        else total_time_period
+    return context.SimulationContext(
+        traces,
+        target_num_instances=target_num_instances,
+        num_repeats=num_repeats,
+        cold_start_delay=cold_start_delay,
+        total_time_period=total_time_period,
+        slo=slo,
+        cost_demand=cost_demand,
+        spot_policy=spot_policy,
+        autoscaler=autoscaler,
+        latency_engine=latency_engine,
+        load_balancer=load_balancer,
+        redistribute_requests=redistribute_requests,
+        replica_model=replica_model,
+        max_batch_size=max_batch_size,
+        service_time_model=service_time_model,
+        request_log_dir=request_log_dir,
+        seed=seed,
     )
-    config.num_repeats = num_repeats
-    config.slo = slo
-    utils.generate_random_offset()
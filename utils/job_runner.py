@@ -4,19 +4,25 @@ import os
 import ray
 
 from policies import spot_policy
-from utils import config, init
+from utils import config, context, init
 
 
-def get_config_dict(args):
+def get_config_dict(args, ctx: context.SimulationContext):
     config_dict = {}
-    config_dict["target_num_instances"] = config.target_num_instances
-    config_dict["total_time_period"] = config.total_time_period
-    config_dict["cold_start_delay"] = config.cold_start_delay
-    config_dict["num_repeats"] = config.num_repeats
-    config_dict["gap_seconds"] = config.gap_seconds
-    config_dict["time_tick_in_seconds"] = config.time_tick_in_seconds
-    config_dict["autoscaler"] = config.autoscaler.value
-    config_dict["trace_addr"] = config.trace_addr
+    config_dict["target_num_instances"] = ctx.target_num_instances
+    config_dict["total_time_period"] = ctx.total_time_period
+    config_dict["cold_start_delay"] = ctx.cold_start_delay
+    config_dict["num_repeats"] = ctx.num_repeats
+    config_dict["gap_seconds"] = ctx.gap_seconds
+    config_dict["time_tick_in_seconds"] = ctx.time_tick_in_seconds
+    config_dict["autoscaler"] = ctx.autoscaler.value
+    config_dict["trace_addr"] = ctx.trace_addr
+    config_dict["latency_engine"] = args.latency_engine.value
+    config_dict["load_balancer"] = args.load_balancer.value
+    config_dict["redistribute_requests"] = args.redistribute_requests
+    config_dict["replica_model"] = args.replica_model.value
+    config_dict["max_batch_size"] = args.max_batch_size
+    config_dict["service_time_model"] = args.service_time_model.value
     config_dict["overprovision_num"] = args.overprovision_num
     config_dict["workload"] = args.workload.value
     config_dict["spot_policy"] = args.spot_policy.value
@@ -28,8 +34,8 @@ def _get_file_location(args):
     return f"./{args.results_dir}/{args.trace_addr}_{args.workload.value}_{args.spot_policy.value}_{args.fallback_policy.value}_{args.autoscaler.value}.jsonl"
 
 
-def write_results_to_file(dict_results, args):
-    dict_results = {**get_config_dict(args), **dict_results}
+def write_results_to_file(dict_results, args, ctx: context.SimulationContext):
+    dict_results = {**get_config_dict(args, ctx), **dict_results}
     jsonl = json.dumps(dict_results)
     with open(
         _get_file_location(args),
@@ -38,8 +44,8 @@ def write_results_to_file(dict_results, args):
         f.write(jsonl + "\n")
 
 
-def check_config_exists(args):
-    config_dict = get_config_dict(args)
+def check_config_exists(args, ctx: context.SimulationContext):
+    config_dict = get_config_dict(args, ctx)
 
     if os.path.exists(
         _get_file_location(args),
@@ -51,7 +57,7 @@ def check_config_exists(args):
                 json_data = json.loads(line)
                 different = False
                 for key, value in config_dict.items():
-                    if json_data[key] != value:
+                    if json_data.get(key) != value:
                         different = True
                 if not different:
                     print("Skip", config_dict)
@@ -63,7 +69,7 @@ def check_config_exists(args):
 
 @ray.remote(num_cpus=1)
 def run_one_exp(args):
-    init.init(
+    ctx = init.init(
         target_num_instances=args.target_num_instances,
         num_repeats=args.num_repeats,
         cold_start_delay=args.cold_start_delay,
@@ -75,13 +81,22 @@ def run_one_exp(args):
         trace_addr=args.trace_addr,
         workload_dir=args.workload.value,
         seed=args.seed,
+        latency_engine=args.latency_engine,
+        load_balancer=args.load_balancer,
+        redistribute_requests=args.redistribute_requests,
+        replica_model=args.replica_model,
+        max_batch_size=args.max_batch_size,
+        service_time_model=args.service_time_model,
+        request_log_dir=args.request_log_dir,
     )
 
-    if check_config_exists(args):
+    if check_config_exists(args, ctx):
         return {}
 
-    results = spot_policy.Policy.from_name(args.spot_policy)(args=args).run_exp()
+    results = spot_policy.Policy.from_name(args.spot_policy)(
+        args=args, ctx=ctx
+    ).run_exp()
 
     for result in results:
-        write_results_to_file(result, args)
+        write_results_to_file(result, args, ctx)
     return results
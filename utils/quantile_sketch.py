@@ -0,0 +1,138 @@
+import math
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+class LatencySketch:
+    """Mergeable quantile sketch with bounded relative error.
+
+    Values are counted in logarithmic buckets whose width grows by a factor
+    `gamma = (1 + alpha) / (1 - alpha)`, so every quantile is reported within
+    a relative error of `alpha` while memory only depends on the value range.
+    Two sketches with the same `alpha` merge by adding bucket counts, which
+    lets results of different repeats be combined without the raw samples.
+    """
+
+    DEFAULT_ALPHA = 0.005
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA) -> None:
+        assert 0 < alpha < 1, alpha
+        self.alpha = alpha
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        assert value >= 0, value
+        if value == 0:
+            self.zero_count += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def add_many(self, values: Iterable[float]) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return
+        assert values.min() >= 0, values.min()
+        positive = values[values > 0]
+        self.zero_count += len(values) - len(positive)
+        keys, counts = np.unique(
+            np.ceil(np.log(positive) / self._log_gamma).astype(np.int64),
+            return_counts=True,
+        )
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: "LatencySketch") -> None:
+        assert self.alpha == other.alpha, (self.alpha, other.alpha)
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @classmethod
+    def merged(
+        cls, sketches: Iterable["LatencySketch"], alpha: Optional[float] = None
+    ) -> "LatencySketch":
+        sketches = list(sketches)
+        if alpha is None:
+            alpha = sketches[0].alpha if sketches else cls.DEFAULT_ALPHA
+        result = cls(alpha)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    @classmethod
+    def from_values(
+        cls, values: Iterable[float], alpha: float = DEFAULT_ALPHA
+    ) -> "LatencySketch":
+        sketch = cls(alpha)
+        sketch.add_many(values)
+        return sketch
+
+    @property
+    def mean(self) -> float:
+        assert self.count > 0
+        return self.sum / self.count
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile `q` in [0, 1], within a relative error of alpha."""
+        assert self.count > 0
+        assert 0 <= q <= 1, q
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                value = 2 * self._gamma**key / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def percentile(self, p: float) -> float:
+        """Same as `np.percentile` on the sketched values, approximately."""
+        return self.quantile(p / 100)
+
+    def to_dict(self) -> dict:
+        keys = sorted(self.bins)
+        return {
+            "alpha": self.alpha,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zero_count": self.zero_count,
+            "keys": keys,
+            "counts": [self.bins[key] for key in keys],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencySketch":
+        sketch = cls(data["alpha"])
+        sketch.bins = dict(zip(data["keys"], data["counts"]))
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
@@ -0,0 +1,131 @@
+"""Columnar per-request records of a latency simulation.
+
+A log is a directory with one raw little-endian binary file per column and a
+`schema.json` listing the columns, their dtypes and the number of rows. The
+writer buffers rows in fixed-size NumPy chunks and appends a chunk to every
+column file at once, so recording a request costs a few array stores.
+"""
+
+import enum
+import json
+import os
+import shutil
+from typing import Dict
+
+import numpy as np
+
+_SCHEMA_FILE = "schema.json"
+_CHUNK_ROWS = 1 << 16
+
+COLUMNS = {
+    "arrival": "<f8",
+    "client": "<i2",
+    # Node that finished the request, or -1 if no node was up at arrival.
+    "node": "<i4",
+    # Number of nodes at arrival.
+    "num_nodes": "<i4",
+    # Service start, NaN unless the request was served.
+    "start": "<f8",
+    # Time at which the outcome was recorded.
+    "end": "<f8",
+    "latency": "<f8",
+    "outcome": "<i1",
+}
+
+
+class Outcome(enum.IntEnum):
+    Served = 0
+    TimedOut = 1
+    Dropped = 2  # Still queued on a node removed by a scale-down.
+
+
+class RequestLogWriter:
+    def __init__(self, log_dir: str) -> None:
+        self.log_dir = log_dir
+        # Concurrent jobs may export the same timeline; each one writes into
+        # its own directory, which is renamed into place when complete.
+        self._tmp_dir = f"{log_dir}.{os.getpid()}.tmp"
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+        os.makedirs(self._tmp_dir)
+        self.num_rows = 0
+        self._chunk = {
+            column: np.empty(_CHUNK_ROWS, dtype=dtype)
+            for column, dtype in COLUMNS.items()
+        }
+        self._chunk_rows = 0
+        self._files = {
+            column: open(os.path.join(self._tmp_dir, f"{column}.bin"), "wb")
+            for column in COLUMNS
+        }
+
+    def add(self, arrival, client, node, num_nodes, start, end, latency, outcome):
+        row = self._chunk_rows
+        chunk = self._chunk
+        chunk["arrival"][row] = arrival
+        chunk["client"][row] = client
+        chunk["node"][row] = node
+        chunk["num_nodes"][row] = num_nodes
+        chunk["start"][row] = start
+        chunk["end"][row] = end
+        chunk["latency"][row] = latency
+        chunk["outcome"][row] = outcome
+        self._chunk_rows += 1
+        if self._chunk_rows == _CHUNK_ROWS:
+            self._flush()
+
+    def add_many(self, **columns: np.ndarray) -> None:
+        """Appends whole columns, e.g. from a vectorized engine."""
+        assert set(columns) == set(COLUMNS), set(columns) ^ set(COLUMNS)
+        self._flush()
+        for column, dtype in COLUMNS.items():
+            values = np.asarray(columns[column], dtype=dtype)
+            self._files[column].write(values.tobytes())
+        self.num_rows += len(columns["arrival"])
+
+    def _flush(self) -> None:
+        for column, values in self._chunk.items():
+            self._files[column].write(values[: self._chunk_rows].tobytes())
+        self.num_rows += self._chunk_rows
+        self._chunk_rows = 0
+
+    def close(self) -> None:
+        self._flush()
+        for f in self._files.values():
+            f.close()
+        schema = {"num_rows": self.num_rows, "columns": COLUMNS}
+        with open(os.path.join(self._tmp_dir, _SCHEMA_FILE), "w") as f:
+            json.dump(schema, f)
+        if exists(self.log_dir):
+            # Another job exported the same timeline first.
+            shutil.rmtree(self._tmp_dir)
+            return
+        # Left behind by a writer that did not finish.
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+        try:
+            os.replace(self._tmp_dir, self.log_dir)
+        except OSError:
+            if not exists(self.log_dir):
+                raise
+            shutil.rmtree(self._tmp_dir)
+
+
+def exists(log_dir: str) -> bool:
+    return os.path.exists(os.path.join(log_dir, _SCHEMA_FILE))
+
+
+def load_request_log(log_dir: str) -> Dict[str, np.ndarray]:
+    """Memory-maps every column of a request log."""
+    with open(os.path.join(log_dir, _SCHEMA_FILE), "r") as f:
+        schema = json.load(f)
+    columns = {}
+    for column, dtype in schema["columns"].items():
+        if schema["num_rows"] == 0:
+            columns[column] = np.empty(0, dtype=dtype)
+            continue
+        columns[column] = np.memmap(
+            os.path.join(log_dir, f"{column}.bin"),
+            dtype=dtype,
+            mode="r",
+            shape=(schema["num_rows"],),
+        )
+    return columns
@@ -1,16 +1,18 @@
 import numpy as np
 
-from utils import config
+from utils import context
 
 
-def generate_random_offset():
-    for _ in range(config.num_repeats):
-        config.random_offsets.append(
-            np.random.randint(0, config.min_trace_len - config.total_time_period)
-        )
+def available_spot_matrix(ctx: context.SimulationContext, i):
+    """Number of available spots at every tick of repeat `i`.
 
-
-def num_available_spot(region_idx, t, i):
-    region_trace = config.trace_for_each_region[config.regions[region_idx]]
-    trace_len = len(region_trace)
-    return region_trace[(t + config.random_offsets[i]) % trace_len]
+    Returns a [total_time_period, len(ctx.regions)] array that already
+    applies the repeat's random offset and the current region order.
+    """
+    ticks = np.arange(ctx.total_time_period) + ctx.random_offsets[i]
+    available_spots = np.empty(
+        (ctx.total_time_period, len(ctx.regions)), dtype=np.int64
+    )
+    for region_idx, region in enumerate(ctx.regions):
+        available_spots[:, region_idx] = ctx.trace_for_each_region[region].at(ticks)
+    return available_spots
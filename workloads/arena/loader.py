@@ -1,25 +1,30 @@
 import json
+import mmap
 import os
-from typing import Optional
-import datasets
+from typing import Optional, Sequence
 
+import numpy as np
+
+from utils import files
+
+# Written by earlier versions; converted into the columnar cache if present.
 _ARENA_DATASET_CACHE_FILE = "workloads/arena/arena_dataset_cache.json"
+# Columnar cache: intervals and prompt lengths as NumPy arrays, conversations
+# as one blob of JSON documents indexed by byte offsets. Delete the directory
+# to rebuild it.
+_ARENA_CACHE_DIR = "workloads/arena/arena_cache"
+_INTERVALS_FILE = "intervals.npy"
+_PROMPT_TOKENS_FILE = "prompt_tokens.npy"
+_OFFSETS_FILE = "conversation_offsets.npy"
+_CONVERSATIONS_FILE = "conversations.bin"
 _ARENA_TRACE_SCALE = 20
+# Rough characters per token of Llama-style tokenizers on English chat text.
+_CHARS_PER_TOKEN = 4
 
 
-def load_arena_dataset(arena_trace_scale: Optional[float] = _ARENA_TRACE_SCALE):
-    if os.path.exists(_ARENA_DATASET_CACHE_FILE):
-        with open(_ARENA_DATASET_CACHE_FILE, "r") as f:
-            cached_data = json.load(f)
-            original_intervals = cached_data["original_intervals"]
-            if arena_trace_scale is not None:
-                intervals = [
-                    interval / arena_trace_scale for interval in original_intervals
-                ]
-            else:
-                intervals = original_intervals
-            conversations = cached_data["conversations"]
-            return intervals, conversations
+def _download_arena_dataset():
+    """Unscaled intervals and conversations of the Chatbot Arena dataset."""
+    import datasets
 
     ds = datasets.load_dataset("lmsys/chatbot_arena_conversations")
     train_ds = ds["train"]
@@ -52,20 +57,91 @@ def load_arena_dataset(arena_trace_scale: Optional[float] = _ARENA_TRACE_SCALE):
     original_intervals = [
         timestamps[i + 1] - timestamps[i] for i in range(len(timestamps) - 1)
     ]
-    if arena_trace_scale is not None:
-        intervals = [interval / arena_trace_scale for interval in original_intervals]
+    return original_intervals, conversations
+
+
+def _count_prompt_tokens(conversation) -> int:
+    num_chars = sum(len(message["content"]) for message in conversation)
+    return max(1, round(num_chars / _CHARS_PER_TOKEN))
+
+
+def _write_cache(original_intervals, conversations):
+    os.makedirs(_ARENA_CACHE_DIR, exist_ok=True)
+    blobs = [json.dumps(conversation).encode() for conversation in conversations]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+    prompt_tokens = np.array(
+        [_count_prompt_tokens(conversation) for conversation in conversations],
+        dtype=np.int32,
+    )
+
+    def path(name):
+        return os.path.join(_ARENA_CACHE_DIR, name)
+
+    files.atomic_write(path(_CONVERSATIONS_FILE), lambda f: f.writelines(blobs))
+    files.atomic_write(path(_OFFSETS_FILE), lambda f: np.save(f, offsets))
+    files.atomic_write(path(_PROMPT_TOKENS_FILE), lambda f: np.save(f, prompt_tokens))
+    # Written last, so its presence means the cache is complete.
+    files.atomic_write(
+        path(_INTERVALS_FILE),
+        lambda f: np.save(f, np.asarray(original_intervals, dtype=np.float64)),
+    )
+
+
+def _ensure_cache():
+    if os.path.exists(os.path.join(_ARENA_CACHE_DIR, _INTERVALS_FILE)):
+        return
+    if os.path.exists(_ARENA_DATASET_CACHE_FILE):
+        with open(_ARENA_DATASET_CACHE_FILE, "r") as f:
+            cached_data = json.load(f)
+        original_intervals = cached_data["original_intervals"]
+        conversations = cached_data["conversations"]
     else:
-        intervals = original_intervals
-
-    # Scale intervals.
-    print(intervals[:5])
-    with open(_ARENA_DATASET_CACHE_FILE, "w") as f:
-        json.dump(
-            {
-                "original_intervals": original_intervals,
-                "conversations": conversations,
-            },
-            f,
-            indent=4,
-        )
-    return intervals, conversations
+        original_intervals, conversations = _download_arena_dataset()
+    _write_cache(original_intervals, conversations)
+
+
+class LazyConversations(Sequence):
+    """Conversations of the columnar cache, decoded only when indexed.
+
+    The blob is memory-mapped on first access, so workloads that never send
+    conversations, like the simulator, never read it.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        self._cache_dir = cache_dir
+        self._offsets = np.load(os.path.join(cache_dir, _OFFSETS_FILE), mmap_mode="r")
+        self._blob: Optional[mmap.mmap] = None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        if self._blob is None:
+            with open(os.path.join(self._cache_dir, _CONVERSATIONS_FILE), "rb") as f:
+                self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        idx = range(len(self))[idx]
+        return json.loads(self._blob[self._offsets[idx] : self._offsets[idx + 1]])
+
+    def __getstate__(self):
+        # The mapping cannot be pickled; it is reopened on first access.
+        return {**self.__dict__, "_blob": None}
+
+
+def load_arena_dataset(arena_trace_scale: Optional[float] = _ARENA_TRACE_SCALE):
+    """Intervals divided by `arena_trace_scale` and the lazy conversations."""
+    _ensure_cache()
+    intervals = np.load(os.path.join(_ARENA_CACHE_DIR, _INTERVALS_FILE))
+    if arena_trace_scale is not None:
+        intervals = intervals / arena_trace_scale
+    return intervals, LazyConversations(_ARENA_CACHE_DIR)
+
+
+def load_arena_prompt_tokens() -> np.ndarray:
+    """Prompt length in tokens of every conversation, in dataset order.
+
+    Computed once from the conversation text when the cache is built, so the
+    simulator never has to look at the text itself.
+    """
+    _ensure_cache()
+    return np.load(os.path.join(_ARENA_CACHE_DIR, _PROMPT_TOKENS_FILE), mmap_mode="r")